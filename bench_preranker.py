@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import random
+from core.preranker import HeadlinePreRanker
+from core.scraper import NewsScraper
+
+# Benchmark: how much the local pre-ranker shrinks the Groq judge prompt.
+# Run: python bench_preranker.py [--live]   (--live also times real Groq calls)
+
+SUBJECTS = [
+    "NASA rover", "James Webb telescope", "A rogue black hole", "Astronomers",
+    "A new exoplanet", "The Moon's south pole", "SpaceX Starship", "A dying star",
+    "Europa's ocean", "A fast radio burst", "Mars sample return", "The Sun",
+]
+EVENTS = [
+    "reveals hidden structure", "baffles scientists", "breaks distance record",
+    "may harbor water", "sends strange signal", "collides with neighbour",
+    "caught in the act", "rewrites textbook", "faces budget cuts", "spotted again",
+]
+
+
+def make_candidates(n, rng):
+    now = time.time()
+    return [
+        {
+            "title": f"{rng.choice(SUBJECTS)} {rng.choice(EVENTS)} ({i})",
+            "published": now - rng.uniform(0, 96) * 3600,
+            "link": f"https://example.com/{i}",
+        }
+        for i in range(n)
+    ]
+
+
+def est_tokens(text):
+    # Llama tokenizers average ~4 characters per token on English prose
+    return len(text) // 4
+
+
+def time_judge(prompt):
+    from groq import Groq
+
+    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    t0 = time.perf_counter()
+    client.chat.completions.create(
+        messages=[{"role": "user", "content": prompt}],
+        model="llama-3.3-70b-versatile",
+        response_format={"type": "json_object"},
+    )
+    return time.perf_counter() - t0
+
+
+def run(live=False, pool=60, top_k=20):
+    rng = random.Random(42)
+    candidates = make_candidates(pool, rng)
+    recent = [c["title"] for c in make_candidates(30, rng)]
+
+    ranker = HeadlinePreRanker(top_k=top_k)
+    t0 = time.perf_counter()
+    kept = ranker.rank(candidates, "space", recent_titles=recent)
+    rank_ms = (time.perf_counter() - t0) * 1000
+
+    # Determinism check: same input -> same output
+    assert kept == ranker.rank(candidates, "space", recent_titles=recent)
+
+    full_prompt = NewsScraper.build_top_3_prompt(candidates, "space")
+    short_prompt = NewsScraper.build_top_3_prompt(kept, "space")
+    full_tok, short_tok = est_tokens(full_prompt), est_tokens(short_prompt)
+
+    print(f"📊 Pool: {pool} headlines -> top {len(kept)} (ranked in {rank_ms:.1f} ms)")
+    print(f"   🧾 Judge prompt: ~{full_tok} -> ~{short_tok} tokens ({1 - short_tok / full_tok:.0%} fewer)")
+
+    if live:
+        full_s = time_judge(full_prompt)
+        short_s = time_judge(short_prompt)
+        print(f"   ⏱️ Judge latency: {full_s:.2f}s -> {short_s:.2f}s")
+
+
+if __name__ == "__main__":
+    run(live="--live" in sys.argv)
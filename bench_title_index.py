@@ -0,0 +1,76 @@
+import time
+import random
+import difflib
+from core.title_index import TitleIndex
+
+# Benchmark: LSH title index vs the old linear difflib scan in task_exists.
+# Run: python bench_title_index.py [n_tasks]
+
+WORDS = (
+    "nasa mars galaxy ancient roman fossil ocean whale forest discovery secret "
+    "hidden lost city empire comet asteroid planet star dinosaur species rare "
+    "temple tomb pharaoh volcano climate ice glacier moon rover telescope habit "
+    "mind success fear courage focus stoic morning routine wisdom truth found"
+).split()
+
+
+def make_vocab(rng, size=3000):
+    # Real headlines draw on a large vocabulary; pad the themed words with
+    # synthetic ones so bucket sizes resemble production rather than a toy set.
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    extra = ["".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(size)]
+    return WORDS + extra
+
+
+def make_title(rng, vocab):
+    return " ".join(rng.choice(vocab) for _ in range(rng.randint(6, 10))).title()
+
+
+def linear_scan(title, titles):
+    for existing in titles:
+        if difflib.SequenceMatcher(None, title.lower(), existing.lower()).ratio() > 0.85:
+            return True
+    return False
+
+
+def run(n_tasks=100_000, n_queries=50):
+    rng = random.Random(7)
+    vocab = make_vocab(rng)
+    titles = [make_title(rng, vocab) for _ in range(n_tasks)]
+
+    index = TitleIndex()
+    t0 = time.perf_counter()
+    for i, title in enumerate(titles):
+        index.add(i, title)
+    build = time.perf_counter() - t0
+
+    # Half the queries are near-duplicates of stored titles, half are fresh
+    queries = []
+    for i in range(n_queries):
+        if i % 2 == 0:
+            base = rng.choice(titles)
+            queries.append(base + "s")
+        else:
+            queries.append(make_title(rng, vocab))
+
+    t0 = time.perf_counter()
+    indexed = [index.query(q)[1] is not None for q in queries]
+    indexed_time = (time.perf_counter() - t0) / n_queries
+
+    sample = min(n_tasks, 5_000)
+    t0 = time.perf_counter()
+    for q in queries[:5]:
+        linear_scan(q, titles[:sample])
+    linear_time = (time.perf_counter() - t0) / 5 * (n_tasks / sample)
+
+    recall = sum(indexed[0::2]) / len(indexed[0::2])
+    print(f"📊 Tasks: {n_tasks:,} | Index build: {build:.1f}s")
+    print(f"   ⚡ Indexed lookup: {indexed_time * 1000:.2f} ms/query")
+    print(f"   🐢 Linear difflib (extrapolated): {linear_time * 1000:.0f} ms/query")
+    print(f"   🎯 Near-duplicate recall: {recall:.0%}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,130 @@
+import os
+import re
+import hashlib
+import threading
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+
+class _ReadableTextParser(HTMLParser):
+    """
+    Tiny readability-style extractor: keeps paragraph text, drops scripts,
+    navigation, headers/footers and sidebars. Good enough for news pages
+    and far cheaper than rendering or a full DOM.
+    """
+
+    SKIP = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "figure"}
+    BLOCKS = {"p", "h2", "h3", "li", "blockquote"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.skip_depth = 0
+        self.block_depth = 0
+        self.current = []
+        self.paragraphs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skip_depth += 1
+        elif tag in self.BLOCKS:
+            self.block_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag in self.BLOCKS and self.block_depth:
+            self.block_depth -= 1
+            if not self.block_depth:
+                text = re.sub(r"\s+", " ", "".join(self.current)).strip()
+                if text:
+                    self.paragraphs.append(text)
+                self.current = []
+
+    def handle_data(self, data):
+        if self.block_depth and not self.skip_depth:
+            self.current.append(data)
+
+
+class ArticleFetcher:
+    """
+    Optional full-article stage after topic selection.
+
+    Streams the article HTML with a hard byte cap, extracts the readable
+    body text and caches it on disk by URL, so reruns never refetch the
+    same page. Enable with ARTICLE_FETCH=1.
+    """
+
+    def __init__(self, session=None, cache_dir="data/article_cache"):
+        self.enabled = os.getenv("ARTICLE_FETCH", "0").lower() in ("1", "true", "yes")
+        self.session = session or requests.Session()
+        self.cache_dir = cache_dir
+        self.max_bytes = int(float(os.getenv("ARTICLE_MAX_KB", "1536")) * 1024)
+        self.max_chars = int(os.getenv("ARTICLE_MAX_CHARS", "8000"))
+        self.timeout = float(os.getenv("ARTICLE_TIMEOUT", "10"))
+        self.workers = int(os.getenv("ARTICLE_WORKERS", "4"))
+        self._slots = threading.BoundedSemaphore(self.workers)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".txt")
+
+    def extract(self, html):
+        parser = _ReadableTextParser()
+        try:
+            parser.feed(html)
+            parser.close()
+        except Exception:
+            pass
+        # Short fragments are bylines, captions, share buttons...
+        paragraphs = [p for p in parser.paragraphs if len(p) >= 40]
+        return "\n".join(paragraphs)[: self.max_chars]
+
+    def download(self, url):
+        """Streams at most max_bytes of HTML; returns None for non-HTML or errors."""
+        with self._slots:
+            with self.session.get(url, stream=True, timeout=self.timeout) as r:
+                if r.status_code != 200:
+                    return None
+                if "html" not in r.headers.get("Content-Type", "html"):
+                    return None
+
+                chunks = []
+                size = 0
+                for chunk in r.iter_content(chunk_size=16384):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes:
+                        break
+                raw = b"".join(chunks)[: self.max_bytes]
+                return raw.decode(r.encoding or "utf-8", errors="ignore")
+
+    def fetch(self, url):
+        """Cleaned article text for `url` ('' when unavailable or disabled)."""
+        if not self.enabled or not url:
+            return ""
+
+        path = self._path(url)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+
+        try:
+            html = self.download(url)
+        except Exception as e:
+            print(f"      ⚠️ Article fetch failed: {e}")
+            return ""
+        text = self.extract(html) if html else ""
+
+        if text:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            print(f"      📰 Article extracted: {len(text)} chars.")
+        return text
+
+    def fetch_many(self, urls):
+        """{url: text} for several URLs, never more than `workers` downloads at once."""
+        if not self.enabled or not urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return dict(zip(urls, pool.map(self.fetch, urls)))
@@ -1,25 +1,102 @@
 import os
-import whisper
 import moviepy.video.fx as vfx
 from moviepy import (
     AudioFileClip,
     TextClip,
     CompositeVideoClip,
     ImageClip,
+    ColorClip,
     VideoFileClip,  # 🟢 NEW: Added VideoFileClip
     concatenate_videoclips,
 )
+from proglog import TqdmProgressBarLogger
 from core.db_manager import DBManager
 
 FONT_PATH = r"C:\Windows\Fonts\arial.ttf"
 
+class RenderCancelled(Exception):
+    """Raised inside `assemble` once its cancel event is set."""
+
+
+class CancellableBarLogger(TqdmProgressBarLogger):
+    """MoviePy's usual progress bar, but aborts the export once `cancel` is set."""
+
+    def __init__(self, cancel):
+        super().__init__()
+        self.cancel = cancel
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        if self.cancel.is_set():
+            raise RenderCancelled()
+        super().bars_callback(bar, attr, value, old_value)
+
+
 class VideoAssembler:
     def __init__(self):
         self.db = DBManager()
-        self.model = whisper.load_model("base")
+        # Whisper is only a fallback now; loaded lazily on first use
+        self.model = None
+
+    def load_whisper(self):
+        if self.model is None:
+            import whisper
+
+            print("🐢 Loading Whisper (word timings missing)...")
+            self.model = whisper.load_model("base")
+        return self.model
+
+    # 🟢 NEW: Captions from TTS WordBoundary timings; Whisper only as fallback
+    def caption_words(self, scenes, scene_offsets, full_video, folder, narration_path=None):
+        """Returns [{"word", "start", "end"}] on the full-video timeline."""
+        if scene_offsets and all(scenes[i].get("words") for i, _ in scene_offsets):
+            print("📝 Generating Captions (TTS word timings)...")
+            words = []
+            for i, offset in scene_offsets:
+                for w in scenes[i]["words"]:
+                    words.append(
+                        {"word": w["word"], "start": offset + w["start"], "end": offset + w["end"]}
+                    )
+            return words
+
+        if narration_path:
+            # The voice stage already produced the exact track: no re-encode
+            full_audio_path = narration_path
+        else:
+            full_audio_path = os.path.join(folder, "FULL_AUDIO_TEMP.mp3")
+            full_video.audio.write_audiofile(full_audio_path)
 
-    def assemble(self):
-        task = self.db.collection.find_one({"status": "ready_to_assemble"})
+        print("📝 Generating Captions (Whisper)...")
+        result = self.load_whisper().transcribe(full_audio_path, word_timestamps=True)
+        return [word for segment in result["segments"] for word in segment["words"]]
+
+    @staticmethod
+    def pad_to(scene_clips, duration):
+        """Extends a scene's visuals to `duration` by freezing the last frame."""
+        shown = sum(c.duration for c in scene_clips)
+        gap = duration - shown
+        if gap <= 1e-3:
+            return scene_clips
+        filler = None
+        if scene_clips:
+            last = scene_clips[-1]
+            try:
+                filler = last.to_ImageClip(t=max(0, last.duration - 0.05)).with_duration(gap)
+            except Exception:
+                filler = None
+        if filler is None:
+            filler = ColorClip((1080, 1920), color=(10, 10, 10), duration=gap)
+        return scene_clips + [filler]
+
+    def assemble(self, task_id=None, cancel=None):
+        """
+        Renders the ready_to_assemble task (or `task_id`). `cancel` is an
+        optional threading.Event; setting it stops the render with
+        RenderCancelled before anything is marked ready_to_upload.
+        """
+        query = {"status": "ready_to_assemble"}
+        if task_id is not None:
+            query["_id"] = task_id
+        task = self.db.collection.find_one(query)
         if not task:
             return
 
@@ -29,16 +106,43 @@ class VideoAssembler:
         print(f"🎞️ Assembling {len(scenes)} segments with dynamic Video/Image handling...")
 
         final_clips = []
+        scene_offsets = []  # (scene index, start time in the final video)
+        timeline = 0.0
+
+        # 🟢 NEW: Use the voice stage's continuous narration track when present
+        narration = task.get("narration") or {}
+        narration_path = narration.get("path")
+        use_track = bool(
+            narration_path
+            and os.path.exists(narration_path)
+            and len(narration.get("offsets", [])) == len(scenes)
+        )
 
         for i, scene in enumerate(scenes):
-            audio_path = scene["audio_path"]
-            audio_clip = AudioFileClip(audio_path)
-            duration = audio_clip.duration
+            if cancel and cancel.is_set():
+                raise RenderCancelled()
+            if use_track:
+                audio_clip = None
+                duration = narration["offsets"][i]["duration"]
+            else:
+                audio_path = scene["audio_path"]
+                audio_clip = AudioFileClip(audio_path)
+                duration = audio_clip.duration
             visual_paths = scene["image_paths"] # Holds both .mp4 and .jpg paths now
             img_duration = duration / len(visual_paths)
 
+            normalized = scene.get("normalized_paths") or [None] * len(visual_paths)
+
             scene_clips = []
-            for path in visual_paths:
+            for path, norm_path in zip(visual_paths, normalized):
+                # 🟢 NEW: Pre-normalized intermediate -> no per-frame resize/crop/loop
+                if norm_path and os.path.exists(norm_path):
+                    try:
+                        clip = VideoFileClip(norm_path).without_audio()
+                        scene_clips.append(clip.subclipped(0, min(clip.duration, img_duration)))
+                        continue
+                    except Exception as e:
+                        print(f"⚠️ Normalized clip unusable, re-rendering {path}: {e}")
                 try:
                     # 🟢 NEW: Dynamic File Handling (Video vs Image)
                     if path.endswith(".mp4"):
@@ -71,8 +175,17 @@ class VideoAssembler:
                 except Exception as e:
                     print(f"⚠️ Error processing visual {path}: {e}")
 
+            if use_track:
+                # The narration is muxed once, so every scene must cover
+                # exactly its slice of the track or later scenes drift
+                scene_clips = self.pad_to(scene_clips, duration)
+
             if scene_clips:
-                scene_video = concatenate_videoclips(scene_clips).with_audio(audio_clip)
+                scene_video = concatenate_videoclips(scene_clips)
+                if use_track:
+                    scene_video = scene_video.with_duration(duration)
+                if audio_clip is not None:
+                    scene_video = scene_video.with_audio(audio_clip)
 
                 # Title Hook logic (Same as before)
                 if i == 0:
@@ -98,35 +211,39 @@ class VideoAssembler:
                         print(f"⚠️ Could not add title hook: {e}")
 
                 final_clips.append(scene_video)
+                if use_track:
+                    # Captions follow the audio track, not the summed clip lengths
+                    scene_offsets.append((i, narration["offsets"][i]["start"]))
+                else:
+                    scene_offsets.append((i, timeline))
+                timeline += scene_video.duration
 
         # Combine Scenes & Generate Captions
         full_video = concatenate_videoclips(final_clips)
-        full_audio_path = os.path.join(folder, "FULL_AUDIO_TEMP.mp3")
-        full_video.audio.write_audiofile(full_audio_path)
-
-        print("📝 Generating Captions...")
-        result = self.model.transcribe(full_audio_path, word_timestamps=True)
+        if use_track:
+            full_video = full_video.with_audio(AudioFileClip(narration_path))
         caption_clips = []
 
-        for segment in result["segments"]:
-            for word in segment["words"]:
-                txt = (
-                    TextClip(
-                        text=word["word"].strip().upper(),
-                        font=FONT_PATH,
-                        font_size=75,
-                        color="white",
-                        stroke_color="black",
-                        stroke_width=4,
-                        method="caption",
-                        size=(1000, None),
-                        margin=(20, 20),
-                    )
-                    .with_start(word["start"])
-                    .with_duration(word["end"] - word["start"])
-                    .with_position(("center", 1600))
+        for word in self.caption_words(
+            scenes, scene_offsets, full_video, folder, narration_path if use_track else None
+        ):
+            txt = (
+                TextClip(
+                    text=word["word"].strip().upper(),
+                    font=FONT_PATH,
+                    font_size=75,
+                    color="white",
+                    stroke_color="black",
+                    stroke_width=4,
+                    method="caption",
+                    size=(1000, None),
+                    margin=(20, 20),
                 )
-                caption_clips.append(txt)
+                .with_start(word["start"])
+                .with_duration(word["end"] - word["start"])
+                .with_position(("center", 1600))
+            )
+            caption_clips.append(txt)
 
         final_export = CompositeVideoClip(
             [full_video] + caption_clips, size=(1080, 1920)
@@ -142,7 +259,7 @@ class VideoAssembler:
             bitrate="8000k",
             threads=4,
             preset="medium",
-            logger="bar",
+            logger=CancellableBarLogger(cancel) if cancel else "bar",
         )
 
         self.db.collection.update_one(
@@ -1,8 +1,12 @@
+import os
 import json
 import re
-import os
-from groq import Groq  # <--- CHANGED
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
 from core.db_manager import DBManager
+from core.model_router import ModelRouter
+from core.scene_stream import SceneStreamParser
+from core.script_schema import ScriptValidator
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,27 +15,218 @@ load_dotenv()
 class ScriptGenerator:
     def __init__(self):
         self.db = DBManager()
-        # Initialize Groq Client
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))  # <--- CHANGED
-        self.model = "llama-3.3-70b-versatile"  # Fast, high quality
+        # Shared Groq gateway behind the model router ("script" -> 70B)
+        self.llm = ModelRouter.shared()
+
+        # 🟢 NEW: Streamed scripting - scenes are emitted as soon as they close
+        self.stream_enabled = os.getenv("SCRIPT_STREAM", "0").lower() in ("1", "true", "yes")
+        self.scene_subscribers = []
+
+        # 🟢 NEW: Strict schema + targeted re-ask for broken scenes/metadata
+        self.validator = ScriptValidator()
+        self.reask_rounds = int(os.getenv("SCRIPT_REASK_ROUNDS", "2"))
+
+        # A claim older than this is treated as abandoned (crashed/killed run)
+        self.claim_timeout = float(os.getenv("SCRIPT_CLAIM_TIMEOUT_MIN", "30"))
+
+    def subscribe(self, callback):
+        """
+        Registers `callback(task, index, scene)`, called for every scene as
+        soon as it is streamed (TTS, visual search, ...) while the rest of
+        the script is still generating.
+
+        Scenes are locally repaired first and broken ones are never emitted,
+        but `index` is provisional: validate_script may still drop scenes,
+        so the stored script_data can end up shorter. Subscribers should key
+        their work by content (text, keywords), not by index.
+        """
+        self.scene_subscribers.append(callback)
+
+    def stream_script(self, task, messages):
+        """Streams the completion, emitting scenes incrementally; returns the full text."""
+        parser = SceneStreamParser()
+        parts = []
+        for delta in self.llm.stream(
+            "script",
+            messages,
+            response_format={"type": "json_object"},
+            expected_output_tokens=1500,
+        ):
+            parts.append(delta)
+            for index, scene in parser.feed(delta):
+                scene, problems = self.validator.repair_scene(scene)
+                if problems:
+                    # Left for the re-ask in validate_script
+                    print(f"   📡 Scene {index + 1} streamed (invalid, held back).")
+                    continue
+                print(f"   📡 Scene {index + 1} streamed.")
+                for callback in self.scene_subscribers:
+                    try:
+                        callback(task, index, scene)
+                    except Exception as e:
+                        print(f"   ⚠️ Scene subscriber failed: {e}")
+        return "".join(parts)
 
     def repair_json(self, json_str):
         try:
             # Clean generic AI chatter
             json_str = re.sub(r"^[^{]*", "", json_str)
             json_str = re.sub(r"[^}]*$", "", json_str)
-            return json.loads(json_str)
+            try:
+                return json.loads(json_str)
+            except ValueError:
+                # Trailing commas are the most common near-miss
+                return json.loads(re.sub(r",\s*([}\]])", r"\1", json_str))
         except:
             return None
 
+    def reask(self, script, bad_scenes, missing_meta, source, niche):
+        """
+        Small follow-up completion that regenerates ONLY the invalid scenes
+        and missing metadata fields. Returns (parsed patch or None, messages);
+        the messages let the caller reject an answer that didn't fix things.
+        """
+        broken = "\n".join(
+            f'- Scene {i}: {json.dumps(script["scenes"][i], ensure_ascii=False)} -> PROBLEMS: {"; ".join(p)}'
+            for i, p in bad_scenes.items()
+        )
+        prompt = f"""
+            You wrote a {niche} YouTube Shorts script for this story: "{source[:1500]}"
+            Some parts are invalid. Fix ONLY these parts.
+
+            INVALID SCENES (index -> current value -> problems):
+            {broken or "none"}
+
+            MISSING METADATA FIELDS: {", ".join(missing_meta) or "none"}
+
+            RULES:
+            - Each scene: 'text' (1-2 punchy sentences), 'keywords' (EXACTLY 2 specific stock-footage search terms), 'image_count' (1 or 2).
+            - 'title': clickbait, ALL CAPS emphasis words, max 50 chars. 'hashtags': #Viral #Shorts + 3 niche tags. 'tags': comma-separated.
+
+            OUTPUT FORMAT (JSON ONLY):
+            {{
+                "scenes": {{"<index>": {{"text": "...", "keywords": ["A", "B"], "image_count": 1}}}},
+                "metadata": {{"<field>": "..."}}
+            }}
+        """
+        messages = [
+            {"role": "system", "content": "You output ONLY valid JSON."},
+            {"role": "user", "content": prompt},
+        ]
+        try:
+            content = self.llm.complete(
+                "script",
+                messages,
+                response_format={"type": "json_object"},
+                expected_output_tokens=150 * len(bad_scenes) + 60 * len(missing_meta),
+            )
+            patch = self.repair_json(content)
+        except Exception as e:
+            print(f"   ⚠️ Re-ask failed: {e}")
+            patch = None
+        return patch, messages
+
+    def validate_script(self, data, source, niche):
+        """Validates, repairs locally, re-asks for what's still broken, drops the rest."""
+        script, bad, missing = self.validator.validate(data)
+
+        rounds = 0
+        while (bad or missing) and rounds < self.reask_rounds:
+            rounds += 1
+            print(f"   🩹 Re-asking for {len(bad)} scene(s) and {len(missing)} metadata field(s)...")
+            patch, reask_messages = self.reask(script, bad, missing, source, niche)
+            patch = patch or {}
+
+            for key, scene in (patch.get("scenes") or {}).items():
+                try:
+                    index = int(key)
+                except (TypeError, ValueError):
+                    continue
+                if index in bad and isinstance(scene, dict):
+                    script["scenes"][index] = scene
+            for field, value in (patch.get("metadata") or {}).items():
+                if field in missing:
+                    script[field] = value
+
+            script, bad, missing = self.validator.validate(script)
+            if bad or missing:
+                # Partial/useless fix: a later run must ask again, not replay it
+                self.llm.reject("script", reask_messages, {"type": "json_object"})
+
+        if bad:
+            print(f"   ✂️ Dropping {len(bad)} unrecoverable scene(s).")
+            script["scenes"] = [sc for i, sc in enumerate(script["scenes"]) if i not in bad]
+            if len(script["scenes"]) < 3:
+                raise ValueError("Invalid JSON structure from AI")
+        for field in missing:
+            script[field] = None
+
+        return script
+
+    # 🟢 NEW: Atomic claim so concurrent workers never script the same task twice
+    def claim_pending_task(self):
+        """
+        Claims the oldest pending task, or one stuck in 'scripting' whose
+        claim expired because the run that took it died.
+        """
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(minutes=self.claim_timeout)
+        return self.db.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "pending"},
+                    {"status": "scripting", "claimed_at": {"$lt": stale}},
+                    # Claims made before claimed_at existed
+                    {"status": "scripting", "claimed_at": {"$exists": False}},
+                ]
+            },
+            {"$set": {"status": "scripting", "claimed_at": now}},
+            sort=[("created_at", 1)],
+        )
+
     def generate_script(self):
-        task = self.db.collection.find_one({"status": "pending"})
+        task = self.claim_pending_task()
         if not task:
             print("📭 No pending tasks.")
             return
 
+        self.script_task(task)
+
+    # 🟢 NEW: Batch mode - claim N pending tasks and script them concurrently
+    def generate_scripts_batch(self, limit=None, concurrency=None):
+        """
+        Claims up to `limit` pending tasks and runs their Groq completions
+        concurrently (at most `concurrency` at a time). Each task is written
+        back on its own, so one bad response doesn't block the others.
+        """
+        limit = limit or int(os.getenv("SCRIPT_BATCH_SIZE", "8"))
+        concurrency = concurrency or int(os.getenv("SCRIPT_CONCURRENCY", "4"))
+
+        tasks = []
+        while len(tasks) < limit:
+            task = self.claim_pending_task()
+            if not task:
+                break
+            tasks.append(task)
+
+        if not tasks:
+            print("📭 No pending tasks.")
+            return 0
+
+        print(f"🧠 Batch Brain: scripting {len(tasks)} tasks ({concurrency} at a time)...")
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(self.script_task, tasks))
+
+        done = sum(1 for ok in results if ok)
+        print(f"✅ Batch complete: {done}/{len(tasks)} scripted.")
+        return done
+
+    def script_task(self, task):
+        """Scripts one claimed task. Returns True on success."""
         niche = task.get("niche", "tech")
-        source = task.get("content", "")[:3000]
+        # Prefer the extracted article body over the RSS teaser when we have it
+        source = task.get("article_text") or task.get("content", "")
+        source = source[: 6000 if task.get("article_text") else 3000]
         source_url = task.get("source_url", "https://news.google.com")
 
         # PROMPT REMAINS EXACTLY THE SAME AS BEFORE
@@ -90,27 +285,35 @@ class ScriptGenerator:
         try:
             print(f"🧠 Groq Director: Segmenting {niche.upper()} story...")
 
-            # CALL GROQ API
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    # System prompt ensures it forces JSON mode
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that outputs ONLY valid JSON.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                model=self.model,
-                response_format={
-                    "type": "json_object"
-                },  # Groq supports native JSON mode!
-            )
-
-            response_content = chat_completion.choices[0].message.content
-            data = self.repair_json(response_content)
+            messages = [
+                # System prompt ensures it forces JSON mode
+                {
+                    "role": "system",
+                    "content": "You are a helpful assistant that outputs ONLY valid JSON.",
+                },
+                {"role": "user", "content": prompt},
+            ]
 
-            if not data or "scenes" not in data:
-                raise ValueError("Invalid JSON structure from AI")
+            # CALL GROQ API (through the shared gateway)
+            if self.stream_enabled:
+                response_content = self.stream_script(task, messages)
+            else:
+                response_content = self.llm.complete(
+                    "script",
+                    messages,
+                    response_format={
+                        "type": "json_object"
+                    },  # Groq supports native JSON mode!
+                    expected_output_tokens=1500,
+                )
+            try:
+                data = self.validate_script(
+                    self.repair_json(response_content), source, niche
+                )
+            except ValueError:
+                # The task goes back to 'pending': its rerun must not replay this answer
+                self.llm.reject("script", messages, {"type": "json_object"})
+                raise
 
             # 🟢 Create Metadata File (Same as before)
             meta_filename = f"metadata_{task['_id']}.txt"
@@ -130,12 +333,14 @@ class ScriptGenerator:
                 f.write(metadata_content)
 
             # Update Database
+            new_title = data.get("title") or task["title"]
             self.db.collection.update_one(
                 {"_id": task["_id"]},
                 {
                     "$set": {
                         "script_data": data["scenes"],
-                        "title": data.get("title", task["title"]),
+                        "title": new_title,
+                        "title_bands": self.db.title_index.band_keys(new_title),
                         "ai_description": data.get("description"),
                         "ai_hashtags": data.get("hashtags"),
                         "ai_tags": data.get("tags"),
@@ -144,6 +349,13 @@ class ScriptGenerator:
                 },
             )
             print(f"✅ Script Segmented: {len(data['scenes'])} scenes created.")
+            return True
 
         except Exception as e:
             print(f"❌ Brain Error: {e}")
+            # Release the claim so the task can be retried later
+            self.db.collection.update_one(
+                {"_id": task["_id"], "status": "scripting"},
+                {"$set": {"status": "pending"}},
+            )
+            return False
@@ -1,10 +1,11 @@
 import os
 import re
-import difflib
+import time
 import certifi
 from datetime import datetime, timedelta, timezone  # <--- Added timezone import
 from pymongo import MongoClient
 from dotenv import load_dotenv
+from core.title_index import TitleIndex
 
 load_dotenv()
 
@@ -28,6 +29,23 @@ class DBManager:
         self.db = self.client[self.db_name]
         self.collection = self.db["video_tasks_gork"]
 
+        # 🟢 NEW: LSH index for near-duplicate titles (multikey on title_bands)
+        self.title_index = TitleIndex()
+        self.collection.create_index([("title_bands", 1), ("created_at", -1)])
+        self.collection.create_index([("source_url", 1), ("created_at", -1)])
+        self._title_index_backfilled = False
+
+        # 🟢 NEW: Banked topics per slot; Mongo drops them once expired
+        self.topic_bank = self.db["topic_bank"]
+        self.topic_bank.create_index("expires_at", expireAfterSeconds=0)
+        self.topic_bank.create_index([("slot", 1), ("rank", 1)])
+
+        # 🟢 NEW: Assembly job queue consumed by the persistent render worker
+        self.render_jobs = self.db["render_jobs"]
+        self.render_jobs.create_index([("status", 1), ("created_at", 1)])
+        self.render_lease = float(os.getenv("RENDER_LEASE_SEC", "120"))
+        self.render_max_attempts = int(os.getenv("RENDER_MAX_ATTEMPTS", "2"))
+
         self.base_dir = "data/generated_videos_folder"
         os.makedirs(self.base_dir, exist_ok=True)
 
@@ -59,26 +77,272 @@ class DBManager:
                 print(f"      🚫 Duplicate URL Found: '{source_url}' (Used recently)")
                 return True
 
-        # CHECK 2: FUZZY TITLE MATCH
-        recent_tasks = self.collection.find(
-            {"created_at": {"$gte": cutoff_date}}, {"title": 1}
+        # CHECK 2: FUZZY TITLE MATCH (indexed: only tasks sharing an LSH band)
+        self.backfill_title_index()
+        bands = self.title_index.band_keys(new_title)
+        if not bands:
+            return False
+
+        candidates = self.collection.find(
+            {"title_bands": {"$in": bands}, "created_at": {"$gte": cutoff_date}},
+            {"title": 1},
+        )
+        similarity, existing_title = self.title_index.best_match(
+            new_title, (task.get("title", "") for task in candidates)
         )
 
-        for task in recent_tasks:
-            existing_title = task.get("title", "")
+        if existing_title:
+            print(
+                f"      🚫 Duplicate Title Found ({int(similarity*100)}% match): '{new_title}' ≈ '{existing_title}'"
+            )
+            return True
+
+        return False
+
+    # 🟢 NEW: Batch version of task_exists for a whole candidate pool
+    def filter_new(self, candidates):
+        """
+        Returns the candidates that are neither a recent URL nor a fuzzy title
+        duplicate, using one $in query per check instead of one per candidate.
+        Near-duplicates inside the batch itself are collapsed as well.
+        """
+        if not candidates:
+            return []
 
-            similarity = difflib.SequenceMatcher(
-                None, new_title.lower(), existing_title.lower()
-            ).ratio()
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=7)
+        self.backfill_title_index()
 
-            if similarity > 0.85:
-                print(
-                    f"      🚫 Duplicate Title Found ({int(similarity*100)}% match): '{new_title}' ≈ '{existing_title}'"
+        # CHECK 1: URL MATCH (single $in query)
+        urls = [c["link"] for c in candidates if c.get("link")]
+        used_urls = set()
+        if urls:
+            used_urls = {
+                t["source_url"]
+                for t in self.collection.find(
+                    {"source_url": {"$in": urls}, "created_at": {"$gte": cutoff_date}},
+                    {"source_url": 1},
                 )
-                return True
+            }
+
+        # CHECK 2: FUZZY TITLE MATCH (single $in query over all band keys)
+        bands_per_candidate = [self.title_index.band_keys(c["title"]) for c in candidates]
+        all_bands = list({b for bands in bands_per_candidate for b in bands})
+        bucket_titles = {}
+        if all_bands:
+            recent = self.collection.find(
+                {"title_bands": {"$in": all_bands}, "created_at": {"$gte": cutoff_date}},
+                {"title": 1, "title_bands": 1},
+            )
+            for task in recent:
+                for band in task.get("title_bands", []):
+                    bucket_titles.setdefault(band, []).append(task.get("title", ""))
+
+        fresh = []
+        dropped = 0
+        for candidate, bands in zip(candidates, bands_per_candidate):
+            if candidate.get("link") in used_urls:
+                dropped += 1
+                continue
+
+            existing = {t for band in bands for t in bucket_titles.get(band, [])}
+            if self.title_index.best_match(candidate["title"], existing)[1]:
+                dropped += 1
+                continue
+
+            fresh.append(candidate)
+            # Later candidates in this batch are checked against this one too
+            for band in bands:
+                bucket_titles.setdefault(band, []).append(candidate["title"])
+
+        print(f"      🧹 Pre-filter: {len(fresh)} fresh / {dropped} duplicate candidates.")
+        return fresh
+
+    def bank_topics(self, slot, niche, topics, ttl_hours=None):
+        """Replaces the bank for `slot` with `topics` (best first). Returns how many were stored."""
+        if ttl_hours is None:
+            ttl_hours = float(os.getenv("TOPIC_BANK_TTL_HOURS", "24"))
+        now = datetime.now(timezone.utc)
+        docs = [
+            {
+                "slot": slot,
+                "niche": niche,
+                "rank": rank,
+                "title": t["title"],
+                "summary": t["summary"],
+                "link": t["link"],
+                "article_text": t.get("article_text", ""),
+                "banked_at": now,
+                "expires_at": now + timedelta(hours=ttl_hours),
+            }
+            for rank, t in enumerate(topics)
+        ]
+        self.topic_bank.delete_many({"slot": slot})
+        if docs:
+            self.topic_bank.insert_many(docs)
+        return len(docs)
+
+    def pop_banked_topic(self, slot):
+        """Atomically takes the best-ranked, non-expired topic for `slot`."""
+        return self.topic_bank.find_one_and_delete(
+            {"slot": slot, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+            sort=[("rank", 1)],
+        )
+
+    def enqueue_render(self, task_id):
+        job = {
+            "task_id": task_id,
+            "status": "queued",
+            "created_at": datetime.now(timezone.utc),
+        }
+        return self.render_jobs.insert_one(job).inserted_id
 
+    def claim_render_job(self):
+        """
+        Atomically takes the oldest queued job (or None). A running job whose
+        worker stopped heartbeating for longer than the lease is requeued
+        here too, up to `render_max_attempts` times.
+        """
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=self.render_lease)
+        return self.render_jobs.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "queued"},
+                    {
+                        "status": "running",
+                        "heartbeat_at": {"$lt": stale},
+                        "attempts": {"$lt": self.render_max_attempts},
+                    },
+                ]
+            },
+            {
+                "$set": {"status": "running", "started_at": now, "heartbeat_at": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+        )
+
+    def heartbeat_render_job(self, job_id):
+        """Extends the worker's lease; False once the job was cancelled."""
+        res = self.render_jobs.update_one(
+            {"_id": job_id, "status": "running"},
+            {"$set": {"heartbeat_at": datetime.now(timezone.utc)}},
+        )
+        return res.modified_count == 1
+
+    def finish_render_job(self, job_id, status, error=None):
+        # A job cancelled by the waiting pipeline stays cancelled
+        self.render_jobs.update_one(
+            {"_id": job_id, "status": "running"},
+            {
+                "$set": {
+                    "status": status,
+                    "error": error,
+                    "finished_at": datetime.now(timezone.utc),
+                }
+            },
+        )
+
+    def cancel_render_job(self, job_id, query=None):
+        """
+        Cancels the job if it still matches `query`. Returns the status it
+        had just before ("queued" / "running"), or None when nothing matched.
+        """
+        job = self.render_jobs.find_one_and_update(
+            {"_id": job_id, **(query or {"status": {"$in": ["queued", "running"]}})},
+            {"$set": {"status": "cancelled", "finished_at": datetime.now(timezone.utc)}},
+            projection={"status": 1},
+        )
+        return job["status"] if job else None
+
+    def mark_render_stopped(self, job_id):
+        """Worker acknowledgement that it is no longer touching the task."""
+        self.render_jobs.update_one(
+            {"_id": job_id}, {"$set": {"stopped_at": datetime.now(timezone.utc)}}
+        )
+
+    def wait_render_stopped(self, job_id, poll=2.0):
+        """
+        After cancelling a running job, waits until its worker acknowledges
+        (it polls for cancellation with every heartbeat) or stays silent for
+        a whole lease, i.e. is really gone. Only then may the task be
+        assembled elsewhere.
+        """
+        deadline = time.monotonic() + self.render_lease
+        while time.monotonic() < deadline:
+            job = self.render_jobs.find_one({"_id": job_id}, {"stopped_at": 1})
+            if not job or job.get("stopped_at"):
+                return True
+            time.sleep(poll)
         return False
 
+    def wait_render_job(self, job_id, timeout=3600, poll=2.0, pickup_timeout=120):
+        """
+        Blocks until the job is done/failed and returns its final status.
+        Returns "cancelled" (after cancelling the job, so no worker renders
+        it later) when no worker picks it up within `pickup_timeout`, its
+        worker stops heartbeating, or `timeout` passes. A running job is
+        only given up once its worker has stopped rendering.
+        """
+        started = time.monotonic()
+        while True:
+            job = self.render_jobs.find_one({"_id": job_id}, {"status": 1})
+            if not job:
+                return "cancelled"
+            if job["status"] in ("done", "failed", "cancelled"):
+                return job["status"]
+
+            elapsed = time.monotonic() - started
+            stale = datetime.now(timezone.utc) - timedelta(seconds=self.render_lease)
+            if elapsed > timeout:
+                reason, query = "timed out", None
+            elif job["status"] == "queued" and elapsed > pickup_timeout:
+                reason, query = "no worker picked it up", {"status": "queued"}
+            elif job["status"] == "running":
+                reason, query = "worker lost", {"status": "running", "heartbeat_at": {"$lt": stale}}
+            else:
+                reason = query = None
+
+            previous = self.cancel_render_job(job_id, query) if reason else None
+            if previous:
+                print(f"⚠️ Render job {job_id} cancelled: {reason}.")
+                if previous == "running":
+                    print("   ⏳ Waiting for the worker to stop rendering...")
+                    self.wait_render_stopped(job_id, poll)
+                return "cancelled"
+            time.sleep(poll)
+
+    def recent_titles(self, days=7, niche=None, status=None, limit=500):
+        """Titles of recent tasks (optionally per niche / status), newest first."""
+        query = {"created_at": {"$gte": datetime.now(timezone.utc) - timedelta(days=days)}}
+        if niche:
+            query["niche"] = niche
+        if status:
+            query["status"] = status
+        cursor = (
+            self.collection.find(query, {"title": 1})
+            .sort("created_at", -1)
+            .limit(limit)
+        )
+        return [t.get("title", "") for t in cursor]
+
+    def backfill_title_index(self):
+        """One-time pass that adds `title_bands` to recent tasks created before the index existed."""
+        if self._title_index_backfilled:
+            return
+        self._title_index_backfilled = True
+
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=7)
+        missing = self.collection.find(
+            {"created_at": {"$gte": cutoff_date}, "title_bands": {"$exists": False}},
+            {"title": 1},
+        )
+        for task in missing:
+            self.collection.update_one(
+                {"_id": task["_id"]},
+                {"$set": {"title_bands": self.title_index.band_keys(task.get("title", ""))}},
+            )
+
     def add_task(
         self, title, content, source="manual", status="pending", extra_data=None
     ):
@@ -104,9 +368,14 @@ class DBManager:
             "niche": extra_data.get("niche", "motivation"),
             "slot": slot,
             "folder_path": folder_path,
+            "title_bands": self.title_index.band_keys(title),
             # 🟢 FIX 2: Use timezone-aware UTC here too
             "created_at": datetime.now(timezone.utc),
         }
 
+        # 🟢 NEW: Full article body (optional) gives the brain richer input
+        if extra_data.get("article_text"):
+            task["article_text"] = extra_data["article_text"]
+
         self.collection.insert_one(task)
         print(f"📥 Task Added: {title}")
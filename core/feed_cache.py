@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import calendar
+import hashlib
+import threading
+
+
+class FeedCache:
+    """
+    On-disk cache for RSS feeds: remembers ETag / Last-Modified for
+    conditional GETs and the ids of every entry already seen, so the
+    scraper only has to parse and judge what is actually new.
+    """
+
+    def __init__(self, cache_dir="data/feed_cache"):
+        self.cache_dir = cache_dir
+        self.seen_ttl = float(os.getenv("FEED_SEEN_DAYS", "14")) * 86400
+        self.max_recent = 10
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def load(self, url):
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {"url": url, "etag": None, "last_modified": None, "seen": {}, "recent": []}
+
+    def save(self, url, record):
+        path = self._path(url)
+        tmp = f"{path}.tmp"
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(record, f)
+            os.replace(tmp, path)
+
+    def conditional_headers(self, record):
+        headers = {}
+        if record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    @staticmethod
+    def entry_key(entry):
+        return entry.get("id") or entry.get("guid") or entry.get("link") or entry.get("title", "")
+
+    @staticmethod
+    def published_ts(entry):
+        parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        try:
+            return calendar.timegm(parsed) if parsed else None
+        except Exception:
+            return None
+
+    def diff(self, url, record, headers, entries):
+        """
+        Stores the new validators, marks entries as seen and returns only
+        the ones that were not seen on a previous run. Call it only once the
+        entries are actually going to be used.
+        """
+        now = time.time()
+        seen = {
+            k: ts for k, ts in record.get("seen", {}).items() if now - ts < self.seen_ttl
+        }
+
+        fresh = []
+        for e in entries:
+            key = self.entry_key(e)
+            if not key:
+                continue
+            if key not in seen:
+                fresh.append(e)
+            seen[key] = now
+
+        record["etag"] = headers.get("ETag")
+        record["last_modified"] = headers.get("Last-Modified")
+        record["seen"] = seen
+        record["recent"] = [
+            {
+                "id": self.entry_key(e),
+                "title": e.get("title", ""),
+                "summary": e.get("summary", e.get("title", "")),
+                "link": e.get("link", ""),
+                "published": self.published_ts(e),
+            }
+            for e in entries[: self.max_recent]
+            if e.get("title")
+        ]
+        self.save(url, record)
+        return fresh
+
+    def recent(self, url):
+        """Last known entries of a feed, used to top up a thin candidate pool."""
+        return self.load(url).get("recent", [])
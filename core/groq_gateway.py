@@ -0,0 +1,262 @@
+import os
+import time
+import random
+import threading
+from groq import Groq
+from core.llm_cache import LLMCache
+
+
+class TokenBucket:
+    """Classic token bucket; `acquire` blocks until `amount` is available."""
+
+    def __init__(self, capacity, per_seconds=60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / per_seconds
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1.0):
+        """Returns the number of seconds spent waiting."""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        with self._cond:
+            while True:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return waited
+                delay = (amount - self.level) / self.rate
+                self._cond.wait(delay)
+                waited += delay
+
+    def adjust(self, delta):
+        """Refund (+) or charge (-) tokens once the real usage is known."""
+        with self._cond:
+            self._refill()
+            self.level = min(self.capacity, self.level + delta)
+            self._cond.notify_all()
+
+
+class GroqGateway:
+    """
+    Single entry point for every Groq chat completion in the pipeline.
+
+    * RPM / TPM budgets per model, enforced with token buckets
+    * token usage reconciled from `response.usage`
+    * 429 / 5xx / connection errors retried with jittered exponential backoff
+    * response cache (LLMCache) in front of the network
+    * counters for requests, tokens, retries and throttling
+
+    Use `GroqGateway.shared()` so the scraper and the brain draw from the
+    same budget within one process.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+    def __init__(self, api_key=None, cache=None):
+        # Retries are ours: the SDK's own retry loop would bypass the buckets
+        self.client = Groq(api_key=api_key or os.getenv("GROQ_API_KEY"), max_retries=0)
+        self.cache = cache or LLMCache()
+        self.rpm = float(os.getenv("GROQ_RPM", "30"))
+        self.tpm = float(os.getenv("GROQ_TPM", "12000"))
+        self.max_retries = int(os.getenv("GROQ_MAX_RETRIES", "5"))
+        self.base_backoff = float(os.getenv("GROQ_BACKOFF_SECONDS", "1.0"))
+
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.counters = {
+            "requests": 0,
+            "cache_hits": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "retries": 0,
+            "failures": 0,
+            "throttled_seconds": 0.0,
+        }
+        # Per-thread facts about the last call, read by the model router
+        self._local = threading.local()
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _buckets_for(self, model):
+        with self._lock:
+            if model not in self._buckets:
+                self._buckets[model] = (TokenBucket(self.rpm), TokenBucket(self.tpm))
+            return self._buckets[model]
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.counters[key] += amount
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def last_call(self):
+        """
+        {"cached", "network_seconds", "rate_limited"} for this thread's last
+        call. network_seconds is time on the wire only: bucket waits and
+        backoff sleeps are excluded, and a cache hit reports 0.
+        """
+        return getattr(self._local, "info", None)
+
+    @staticmethod
+    def estimate_tokens(messages):
+        # ~4 chars per token for English, plus per-message overhead
+        return sum(len(m.get("content", "")) // 4 + 4 for m in messages)
+
+    def _is_retryable(self, error):
+        status = getattr(error, "status_code", None)
+        if status is not None:
+            return status in self.RETRY_STATUS
+        # APIConnectionError / APITimeoutError carry no status code
+        return error.__class__.__name__ in ("APIConnectionError", "APITimeoutError")
+
+    def _retry_after(self, error):
+        response = getattr(error, "response", None)
+        try:
+            return float(response.headers.get("retry-after"))
+        except Exception:
+            return None
+
+    def _backoff(self, error, attempt, max_retries):
+        """Sleeps before retry `attempt`; re-raises when the error is final."""
+        if attempt > max_retries or not self._is_retryable(error):
+            self._count("failures")
+            raise error
+        self._count("retries")
+        delay = self._retry_after(error)
+        if delay is None:
+            delay = self.base_backoff * (2 ** (attempt - 1))
+        delay = delay * random.uniform(0.8, 1.3)
+        print(f"      ⏳ Groq {getattr(error, 'status_code', 'error')}: retry {attempt}/{max_retries} in {delay:.1f}s")
+        time.sleep(delay)
+
+    def _reconcile(self, tpm_bucket, estimate, usage):
+        if usage is None:
+            return
+        self._count("prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0)
+        self._count("completion_tokens", getattr(usage, "completion_tokens", 0) or 0)
+        tpm_bucket.adjust(estimate - (getattr(usage, "total_tokens", 0) or estimate))
+
+    def _request(self, model, messages, response_format, expected_output_tokens, max_retries, stream=False):
+        """Waits for budget, sends the request, retries; returns (response, bucket, estimate)."""
+        max_retries = self.max_retries if max_retries is None else max_retries
+        rpm_bucket, tpm_bucket = self._buckets_for(model)
+        estimate = self.estimate_tokens(messages) + expected_output_tokens
+
+        kwargs = {"messages": messages, "model": model}
+        if response_format is not None:
+            kwargs["response_format"] = response_format
+        if stream:
+            kwargs["stream"] = True
+
+        info = {"cached": False, "network_seconds": 0.0, "rate_limited": False}
+        self._local.info = info
+
+        attempt = 0
+        while True:
+            waited = rpm_bucket.acquire(1) + tpm_bucket.acquire(estimate)
+            if waited:
+                self._count("throttled_seconds", waited)
+
+            sent = time.monotonic()
+            try:
+                self._count("requests")
+                response = self.client.chat.completions.create(**kwargs)
+                info["network_seconds"] += time.monotonic() - sent
+                return response, tpm_bucket, estimate
+            except Exception as e:
+                info["network_seconds"] += time.monotonic() - sent
+                if getattr(e, "status_code", None) == 429:
+                    info["rate_limited"] = True
+                # The request never consumed its token estimate
+                tpm_bucket.adjust(estimate)
+                attempt += 1
+                self._backoff(e, attempt, max_retries)
+
+    def complete(
+        self, model, messages, response_format=None, expected_output_tokens=512, max_retries=None
+    ):
+        """Rate-limited, cached, retried chat completion; returns the message text."""
+        key = self.cache.make_key(model, messages, response_format)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count("cache_hits")
+            self._local.info = {"cached": True, "network_seconds": 0.0, "rate_limited": False}
+            print("      💾 LLM cache hit (0 tokens).")
+            return cached
+
+        chat_completion, tpm_bucket, estimate = self._request(
+            model, messages, response_format, expected_output_tokens, max_retries
+        )
+        self._reconcile(tpm_bucket, estimate, getattr(chat_completion, "usage", None))
+
+        content = chat_completion.choices[0].message.content
+        self.cache.put(key, model, content)
+        return content
+
+    def invalidate(self, model, messages, response_format=None):
+        """Drops a cached answer the caller rejected, so a retry hits the network."""
+        self.cache.delete(self.cache.make_key(model, messages, response_format))
+
+    # 🟢 NEW: Streamed completion (text deltas) with the same budget/retry/cache rules
+    def stream(
+        self, model, messages, response_format=None, expected_output_tokens=512, max_retries=None
+    ):
+        """
+        Yields text deltas as Groq produces them. Retries only happen before
+        the stream opens; the full text is cached once the stream completes,
+        and a cache hit is replayed as a single delta.
+        """
+        key = self.cache.make_key(model, messages, response_format)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count("cache_hits")
+            self._local.info = {"cached": True, "network_seconds": 0.0, "rate_limited": False}
+            print("      💾 LLM cache hit (0 tokens).")
+            yield cached
+            return
+
+        stream, tpm_bucket, estimate = self._request(
+            model, messages, response_format, expected_output_tokens, max_retries, stream=True
+        )
+
+        info = self._local.info
+        parts = []
+        usage = None
+        chunks = iter(stream)
+        while True:
+            # Only time spent waiting on Groq counts, not the consumer's work
+            received = time.monotonic()
+            chunk = next(chunks, None)
+            info["network_seconds"] += time.monotonic() - received
+            if chunk is None:
+                break
+            # Groq reports usage on the final chunk under x_groq
+            x_groq = getattr(chunk, "x_groq", None)
+            if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                usage = x_groq.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+
+        self._reconcile(tpm_bucket, estimate, usage)
+        self.cache.put(key, model, "".join(parts))
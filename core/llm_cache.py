@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from core.lru_dir import LRUDirectory
+
+
+class LLMCache:
+    """
+    Persistent, content-addressed cache for chat completions.
+
+    Key = sha256(model, messages, response_format). A rerun of the pipeline
+    that sends the exact same prompt gets the stored answer back with no
+    tokens spent and no network round trip. Entries expire after a TTL and
+    the least recently used ones are evicted once the cache outgrows its
+    size budget. Set LLM_CACHE_DISABLE=1 (or `python main.py --no-cache`)
+    to bypass it.
+    """
+
+    def __init__(self, cache_dir="data/llm_cache", enabled=None):
+        self.cache_dir = cache_dir
+        if enabled is None:
+            enabled = os.getenv("LLM_CACHE_DISABLE", "0").lower() not in ("1", "true", "yes")
+        self.enabled = enabled
+        self.ttl = float(os.getenv("LLM_CACHE_TTL_HOURS", "72")) * 3600
+        max_bytes = int(float(os.getenv("LLM_CACHE_MAX_MB", "50")) * 1024 * 1024)
+        self.lru = LRUDirectory(self.cache_dir, max_bytes, ".json")
+
+    @staticmethod
+    def make_key(model, messages, response_format=None):
+        payload = json.dumps(
+            {"model": model, "messages": messages, "response_format": response_format},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except Exception:
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        self.lru.touch(path)
+        return entry.get("content")
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def put(self, key, model, content):
+        if not self.enabled or content is None:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": model, "created_at": time.time(), "content": content}, f)
+        os.replace(tmp, path)
+        self.lru.evict()
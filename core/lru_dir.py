@@ -0,0 +1,65 @@
+import os
+import shutil
+import threading
+
+
+def place(src, dst):
+    """Hard-links `src` to `dst` (copy across filesystems), replacing `dst`."""
+    # Never write through an old hard link: it would corrupt the cache
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class LRUDirectory:
+    """
+    Size budget for a flat cache directory. Every entry is one file ending
+    in `suffix` (plus optional companion files with the same stem); file
+    mtime doubles as the LRU clock, so hits must be touched.
+    """
+
+    def __init__(self, path, max_bytes, suffix, companions=()):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.companions = companions
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def touch(*paths):
+        for path in paths:
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+
+    def evict(self):
+        """Removes least recently used entries until the directory fits the budget."""
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.path):
+                if not name.endswith(self.suffix):
+                    continue
+                path = os.path.join(self.path, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                stem = path[: -len(self.suffix)]
+                for p in (path, *(stem + c for c in self.companions)):
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+                total -= size
@@ -0,0 +1,212 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from core.lru_dir import place
+
+
+class MediaLibrary:
+    """
+    Persistent local store for downloaded stock media.
+
+    * Content-addressed blobs (sha256) -> the same clip is stored once
+    * SQLite index: keyword/provider -> assets, plus a usage log per task
+    * Reuse policy: an asset used in the last MEDIA_REUSE_DAYS days (or
+      already in the current video) is not handed out again, neither from
+      the library nor as a fresh download of the same source URL
+    * LRU eviction of blobs once the library exceeds MEDIA_LIBRARY_MAX_GB
+
+    A hit is hard-linked into the task folder, so no network call is made.
+    """
+
+    def __init__(self, root="data/media_library"):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.reuse_days = float(os.getenv("MEDIA_REUSE_DAYS", "3"))
+        self.max_bytes = int(float(os.getenv("MEDIA_LIBRARY_MAX_GB", "5")) * 1024**3)
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(root, "library.db"), check_same_thread=False)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS assets (
+                hash TEXT PRIMARY KEY,
+                ext TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS asset_keywords (
+                keyword TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (keyword, provider, hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_keyword ON asset_keywords (keyword);
+            CREATE TABLE IF NOT EXISTS usages (
+                hash TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                used_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_usage_hash ON usages (hash, used_at);
+            CREATE TABLE IF NOT EXISTS asset_sources (
+                url TEXT PRIMARY KEY,
+                hash TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_source_hash ON asset_sources (hash);
+            """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def normalize(keyword):
+        return " ".join((keyword or "").lower().split())
+
+    @staticmethod
+    def file_hash(path):
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def blob_path(self, digest, ext):
+        return os.path.join(self.blob_dir, digest + ext)
+
+    def lookup(self, keyword, task_id, dest_base, exts=(".mp4", ".jpg")):
+        """
+        Places a reusable asset for `keyword` at dest_base + ext and returns
+        (path, hash), or (None, None) when nothing suitable is stored.
+        """
+        cutoff = time.time() - self.reuse_days * 86400
+        marks = ",".join("?" for _ in exts)
+        with self._lock:
+            rows = self.conn.execute(
+                f"""
+                SELECT a.hash, a.ext FROM asset_keywords k
+                JOIN assets a ON a.hash = k.hash
+                WHERE k.keyword = ? AND a.ext IN ({marks})
+                  AND a.hash NOT IN (
+                      SELECT hash FROM usages WHERE used_at >= ? OR task_id = ?
+                  )
+                ORDER BY CASE a.ext WHEN '.mp4' THEN 0 ELSE 1 END, a.last_used ASC
+                """,
+                (self.normalize(keyword), *exts, cutoff, str(task_id)),
+            ).fetchall()
+
+        for digest, ext in rows:
+            src = self.blob_path(digest, ext)
+            if not os.path.exists(src):
+                self.forget(digest)
+                continue
+            dest = dest_base + ext
+            try:
+                place(src, dest)
+            except OSError:
+                continue
+            self.mark_used(digest, task_id)
+            return dest, digest
+        return None, None
+
+    def recently_used(self, task_id, digest=None, url=None):
+        """
+        True when the asset (by hash, or by the source URL it was downloaded
+        from) is blocked by the reuse policy for `task_id`.
+        """
+        cutoff = time.time() - self.reuse_days * 86400
+        with self._lock:
+            if digest is None and url is not None:
+                row = self.conn.execute(
+                    "SELECT hash FROM asset_sources WHERE url = ?", (url,)
+                ).fetchone()
+                digest = row[0] if row else None
+            if digest is None:
+                return False
+            row = self.conn.execute(
+                "SELECT 1 FROM usages WHERE hash = ? AND (used_at >= ? OR task_id = ?) LIMIT 1",
+                (digest, cutoff, str(task_id)),
+            ).fetchone()
+        return row is not None
+
+    def add(self, path, keyword, provider, task_id, source_url=None):
+        """Stores a freshly downloaded asset and records its use by `task_id`."""
+        ext = os.path.splitext(path)[1].lower()
+        try:
+            digest = self.file_hash(path)
+            blob = self.blob_path(digest, ext)
+            if not os.path.exists(blob):
+                place(path, blob)
+            size = os.path.getsize(blob)
+        except OSError as e:
+            print(f"      ⚠️ Media library write failed: {e}")
+            return None
+
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO assets (hash, ext, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (digest, ext, size, now, now),
+            )
+            self.conn.execute(
+                "INSERT OR IGNORE INTO asset_keywords (keyword, provider, hash) VALUES (?, ?, ?)",
+                (self.normalize(keyword), provider, digest),
+            )
+            if source_url:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO asset_sources (url, hash) VALUES (?, ?)",
+                    (source_url, digest),
+                )
+            self.conn.commit()
+        self.mark_used(digest, task_id)
+        self.evict()
+        return digest
+
+    def mark_used(self, digest, task_id):
+        now = time.time()
+        with self._lock:
+            self.conn.execute("UPDATE assets SET last_used = ? WHERE hash = ?", (now, digest))
+            self.conn.execute(
+                "INSERT INTO usages (hash, task_id, used_at) VALUES (?, ?, ?)",
+                (digest, str(task_id), now),
+            )
+            self.conn.commit()
+
+    def release(self, digest, task_id):
+        """Undoes the usage record of an asset that `task_id` ended up not using."""
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM usages WHERE hash = ? AND task_id = ?", (digest, str(task_id))
+            )
+            self.conn.commit()
+
+    def forget(self, digest):
+        with self._lock:
+            row = self.conn.execute("SELECT ext FROM assets WHERE hash = ?", (digest,)).fetchone()
+            self.conn.execute("DELETE FROM assets WHERE hash = ?", (digest,))
+            self.conn.execute("DELETE FROM asset_keywords WHERE hash = ?", (digest,))
+            self.conn.execute("DELETE FROM usages WHERE hash = ?", (digest,))
+            self.conn.execute("DELETE FROM asset_sources WHERE hash = ?", (digest,))
+            self.conn.commit()
+        if row:
+            try:
+                os.remove(self.blob_path(digest, row[0]))
+            except OSError:
+                pass
+
+    def evict(self):
+        """Drops least recently used blobs until the library fits its budget."""
+        with self._lock:
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM assets").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            victims = self.conn.execute(
+                "SELECT hash, size FROM assets ORDER BY last_used ASC"
+            ).fetchall()
+
+        for digest, size in victims:
+            if total <= self.max_bytes:
+                break
+            self.forget(digest)
+            total -= size
@@ -0,0 +1,165 @@
+import os
+import time
+import threading
+from core.groq_gateway import GroqGateway
+
+
+class ModelRouter:
+    """
+    Maps each call type to an ordered list of Groq models (primary first)
+    and fails over automatically.
+
+    Per-model network latency (EWMA) and failure counts are recorded on
+    every call. A model that errors, hits a 429, or answers slower than the
+    call type's latency budget is put on cooldown, and the next
+    model in the route takes over until the cooldown expires.
+
+    Routes can be overridden per call type, e.g.
+        GROQ_ROUTE_JUDGE="llama-3.1-8b-instant,llama-3.3-70b-versatile"
+    """
+
+    DEFAULT_ROUTES = {
+        # "Return 3 indices" does not need 70B
+        "judge": ["llama-3.1-8b-instant", "llama-3.3-70b-versatile"],
+        "script": ["llama-3.3-70b-versatile", "llama-3.1-8b-instant"],
+    }
+
+    # Seconds; slower than this -> model goes on cooldown for this call type
+    LATENCY_BUDGET = {"judge": 8.0, "script": 45.0}
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, gateway=None):
+        self.gateway = gateway or GroqGateway.shared()
+        self.cooldown_seconds = float(os.getenv("GROQ_ROUTE_COOLDOWN", "300"))
+        self.routes = {}
+        for call_type, models in self.DEFAULT_ROUTES.items():
+            override = os.getenv(f"GROQ_ROUTE_{call_type.upper()}")
+            self.routes[call_type] = (
+                [m.strip() for m in override.split(",") if m.strip()] if override else list(models)
+            )
+
+        self._lock = threading.Lock()
+        self.health = {}  # model -> {"calls", "failures", "latency", "cooldown_until"}
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _health(self, model):
+        return self.health.setdefault(
+            model, {"calls": 0, "failures": 0, "latency": None, "cooldown_until": 0.0}
+        )
+
+    def _record(self, model, info=None, failed=False, call_type=None):
+        """
+        `info` is the gateway's last_call(): latency is network time only,
+        so our own RPM/TPM throttling never cools a healthy model down, and
+        cache hits add no latency sample.
+        """
+        with self._lock:
+            h = self._health(model)
+            h["calls"] += 1
+            if failed:
+                h["failures"] += 1
+                h["cooldown_until"] = time.monotonic() + self.cooldown_seconds
+                return
+            if not info or info["cached"]:
+                return
+            latency = info["network_seconds"]
+            h["latency"] = latency if h["latency"] is None else 0.7 * h["latency"] + 0.3 * latency
+            # Provider-side slowness or a 429 on the way -> let the next model take over
+            if info["rate_limited"] or latency > self.LATENCY_BUDGET.get(call_type, float("inf")):
+                h["cooldown_until"] = time.monotonic() + self.cooldown_seconds
+
+    def candidates(self, call_type):
+        """Route for `call_type`, healthy models first, cooled-down ones last."""
+        models = self.routes.get(call_type) or self.routes["script"]
+        now = time.monotonic()
+        with self._lock:
+            healthy = [m for m in models if self._health(m)["cooldown_until"] <= now]
+        return healthy + [m for m in models if m not in healthy]
+
+    def stats(self):
+        with self._lock:
+            return {
+                m: {
+                    "calls": h["calls"],
+                    "failure_rate": h["failures"] / h["calls"] if h["calls"] else 0.0,
+                    "latency": h["latency"],
+                }
+                for m, h in self.health.items()
+            }
+
+    def reject(self, call_type, messages, response_format=None):
+        """
+        The caller couldn't use the answer (bad JSON, invalid indices, ...):
+        forget it for every model on the route so the retry is a fresh call.
+        """
+        for model in self.routes.get(call_type) or self.routes["script"]:
+            self.gateway.invalidate(model, messages, response_format)
+
+    def complete(self, call_type, messages, response_format=None, expected_output_tokens=512):
+        models = self.candidates(call_type)
+        last_error = None
+
+        for i, model in enumerate(models):
+            is_last = i == len(models) - 1
+            try:
+                # Fail fast on the primary when a fallback exists
+                content = self.gateway.complete(
+                    model,
+                    messages,
+                    response_format=response_format,
+                    expected_output_tokens=expected_output_tokens,
+                    max_retries=None if is_last else 1,
+                )
+            except Exception as e:
+                self._record(model, failed=True)
+                last_error = e
+                if not is_last:
+                    print(f"      🔀 {model} failed ({e.__class__.__name__}). Failing over to {models[i + 1]}...")
+                continue
+
+            self._record(model, self.gateway.last_call(), call_type=call_type)
+            return content
+
+        raise last_error
+
+    def stream(self, call_type, messages, response_format=None, expected_output_tokens=512):
+        """
+        Streamed variant of `complete`. Failover is only possible until the
+        first delta arrives; after that the stream belongs to that model.
+        """
+        models = self.candidates(call_type)
+        last_error = None
+
+        for i, model in enumerate(models):
+            is_last = i == len(models) - 1
+            deltas = self.gateway.stream(
+                model,
+                messages,
+                response_format=response_format,
+                expected_output_tokens=expected_output_tokens,
+                max_retries=None if is_last else 1,
+            )
+            try:
+                first = next(deltas, None)
+            except Exception as e:
+                self._record(model, failed=True)
+                last_error = e
+                if not is_last:
+                    print(f"      🔀 {model} failed ({e.__class__.__name__}). Failing over to {models[i + 1]}...")
+                continue
+
+            if first is not None:
+                yield first
+            yield from deltas
+            self._record(model, self.gateway.last_call(), call_type=call_type)
+            return
+
+        raise last_error
@@ -0,0 +1,132 @@
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from core.media_library import MediaLibrary
+from core.lru_dir import LRUDirectory, place
+
+WIDTH, HEIGHT, FPS = 1080, 1920, 24
+
+
+def ffmpeg_exe():
+    # MoviePy ships its own ffmpeg through imageio-ffmpeg
+    try:
+        import imageio_ffmpeg
+
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return shutil.which("ffmpeg") or "ffmpeg"
+
+
+def transcode(src, duration, out_path):
+    """
+    Renders `src` (clip or still) into a render-ready intermediate:
+    1080x1920, 24 fps, H.264 yuv420p, no audio, exactly `duration` seconds.
+    Videos are looped/trimmed; stills get the same slow 4%/s centre zoom the
+    assembler used to apply frame by frame. Runs inside a worker process.
+    """
+    fill = (
+        f"scale={WIDTH}:{HEIGHT}:force_original_aspect_ratio=increase,"
+        f"crop={WIDTH}:{HEIGHT}"
+    )
+    if src.lower().endswith(".mp4"):
+        inputs = ["-stream_loop", "-1", "-i", src]
+        vf = f"{fill},fps={FPS},format=yuv420p"
+    else:
+        inputs = ["-loop", "1", "-framerate", str(FPS), "-i", src]
+        vf = (
+            f"{fill},zoompan=z='1+0.04*on/{FPS}':x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)'"
+            f":d=1:s={WIDTH}x{HEIGHT}:fps={FPS},format=yuv420p"
+        )
+
+    # Not *.mp4, so the cache's LRU scan never counts (or evicts) a live render
+    tmp = f"{out_path}.{os.getpid()}.part"
+    cmd = [
+        ffmpeg_exe(), "-y", "-loglevel", "error", *inputs,
+        "-t", f"{duration:.3f}", "-vf", vf, "-an",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "20", "-r", str(FPS),
+        "-f", "mp4", tmp,
+    ]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, timeout=300)
+        os.replace(tmp, out_path)
+        return out_path
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+
+
+class ClipNormalizer:
+    """
+    Background normalization of downloaded b-roll into render-ready
+    intermediates, cached by (asset hash, duration). Jobs run in a process
+    pool while the rest of the visuals are still downloading, so the
+    assembler only has to concatenate, overlay and mux. The cache is LRU
+    evicted past NORMALIZED_CACHE_MAX_MB.
+    """
+
+    def __init__(self, cache_dir="data/normalized_cache"):
+        self.enabled = os.getenv("PRENORMALIZE", "1").lower() not in ("0", "false", "no")
+        self.cache_dir = cache_dir
+        self.workers = int(os.getenv("NORMALIZE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+        self.pool = None
+        # cache path -> future, so identical (hash, duration) jobs share one render
+        self.inflight = {}
+        max_bytes = int(float(os.getenv("NORMALIZED_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+        self.lru = LRUDirectory(self.cache_dir, max_bytes, ".mp4")
+
+    def __enter__(self):
+        if self.enabled:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+            self.inflight.clear()
+            # Everything of this video is placed (linked) by now
+            self.lru.evict()
+        return False
+
+    def submit(self, src, duration, dest):
+        """
+        Schedules normalization of `src` to `dest`. Returns a callable that
+        blocks until the intermediate is ready and returns its path (or None).
+        """
+        if not self.pool or not src or duration <= 0:
+            return lambda: None
+
+        try:
+            digest = MediaLibrary.file_hash(src)
+        except OSError:
+            return lambda: None
+        cached = os.path.join(self.cache_dir, f"{digest}_{int(round(duration * 1000))}.mp4")
+
+        def use(path):
+            if not path:
+                return None
+            try:
+                place(path, dest)
+            except OSError:
+                # Evicted in the meantime -> the assembler renders the original
+                return None
+            self.lru.touch(path)
+            return dest
+
+        if os.path.exists(cached):
+            return lambda: use(cached)
+
+        future = self.inflight.get(cached)
+        if future is None:
+            future = self.pool.submit(transcode, src, duration, cached)
+            self.inflight[cached] = future
+
+        def result():
+            try:
+                return use(future.result())
+            except Exception:
+                return None
+
+        return result
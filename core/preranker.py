@@ -0,0 +1,99 @@
+import re
+import time
+import numpy as np
+
+
+class HeadlinePreRanker:
+    """
+    Offline, deterministic pre-ranking of RSS headlines before the Groq judge.
+
+    Every headline gets a TF-IDF vector (NumPy, no network) and a score made of:
+      * relevance - cosine similarity to the niche profile (seed keywords +
+                    titles we already uploaded in this niche)
+      * novelty   - 1 - max cosine similarity to last week's task titles
+      * recency   - exponential decay on the entry's publish time
+    Only the top K survive, which keeps the judge prompt short.
+    """
+
+    STOPWORDS = set(
+        "the a an and or of to in on for with at by from is are was were be been "
+        "this that these those it its as into about after over new how why what "
+        "who when where will can could may might just than then them they their "
+        "you your our we his her he she not but more most has have had do does".split()
+    )
+
+    NICHE_SEEDS = {
+        "motivation": "motivation habits mindset success discipline focus stoic happiness growth courage",
+        "space": "space nasa galaxy planet star mars moon telescope astronomers universe black hole",
+        "nature": "nature wildlife species animals ocean forest ecology endangered fossil climate",
+        "history": "history ancient archaeology empire war medieval roman egypt discovery tomb",
+    }
+
+    def __init__(self, top_k=20, weights=(0.45, 0.35, 0.20), half_life_hours=48.0):
+        self.top_k = top_k
+        self.w_relevance, self.w_novelty, self.w_recency = weights
+        self.half_life_hours = half_life_hours
+
+    def tokenize(self, text):
+        words = re.findall(r"[a-z0-9]+", (text or "").lower())
+        return [w for w in words if len(w) > 2 and w not in self.STOPWORDS]
+
+    def tfidf(self, docs):
+        """Returns an L2-normalised (len(docs) x vocab) TF-IDF matrix."""
+        tokenized = [self.tokenize(d) for d in docs]
+        vocab = {}
+        for tokens in tokenized:
+            for t in tokens:
+                if t not in vocab:
+                    vocab[t] = len(vocab)
+
+        matrix = np.zeros((len(docs), max(len(vocab), 1)), dtype=np.float32)
+        for row, tokens in enumerate(tokenized):
+            for t in tokens:
+                matrix[row, vocab[t]] += 1.0
+
+        df = np.count_nonzero(matrix, axis=0)
+        idf = np.log((1.0 + len(docs)) / (1.0 + df)) + 1.0
+        matrix *= idf
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def score(self, candidates, niche, profile_titles=(), recent_titles=(), now=None):
+        now = time.time() if now is None else now
+        n = len(candidates)
+
+        profile_text = " ".join([self.NICHE_SEEDS.get(niche, niche)] + list(profile_titles))
+        docs = [c["title"] for c in candidates] + [profile_text] + list(recent_titles)
+        matrix = self.tfidf(docs)
+
+        heads = matrix[:n]
+        profile = matrix[n]
+        recent = matrix[n + 1 :]
+
+        relevance = heads @ profile
+        if len(recent):
+            novelty = 1.0 - (heads @ recent.T).max(axis=1)
+        else:
+            novelty = np.ones(n, dtype=np.float32)
+
+        published = np.array(
+            [c.get("published") or now for c in candidates], dtype=np.float64
+        )
+        age_hours = np.clip((now - published) / 3600.0, 0.0, None)
+        recency = np.power(0.5, age_hours / self.half_life_hours)
+
+        return (
+            self.w_relevance * relevance
+            + self.w_novelty * novelty
+            + self.w_recency * recency
+        )
+
+    def rank(self, candidates, niche, profile_titles=(), recent_titles=(), now=None):
+        """Top K candidates, best first. Ties keep feed order (stable sort)."""
+        if len(candidates) <= self.top_k:
+            return list(candidates)
+        scores = self.score(candidates, niche, profile_titles, recent_titles, now)
+        order = np.argsort(-scores, kind="stable")[: self.top_k]
+        return [candidates[i] for i in order]
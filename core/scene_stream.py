@@ -0,0 +1,82 @@
+import json
+
+
+class SceneStreamParser:
+    """
+    Incremental parser for a streamed script completion.
+
+    Feed it text deltas as they arrive; it returns an (index, scene) pair for
+    every scene object of the top-level "scenes" array as soon as its closing
+    brace is seen, long before the rest of the JSON document is complete. Strings and escapes
+    are tracked so braces inside narration don't confuse it.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.in_scenes = False
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.scene_start = None
+        self.emitted = 0
+        self.done = False
+
+    def _enter_scenes(self):
+        key = self.buffer.find('"scenes"', self.pos)
+        if key == -1:
+            # Keep scanning from near the end next time (key may be split across deltas)
+            self.pos = max(self.pos, len(self.buffer) - len('"scenes"'))
+            return False
+        bracket = self.buffer.find("[", key)
+        if bracket == -1:
+            return False
+        self.in_scenes = True
+        self.pos = bracket + 1
+        return True
+
+    def feed(self, text):
+        self.buffer += text
+        scenes = []
+
+        if self.done:
+            return scenes
+        if not self.in_scenes and not self._enter_scenes():
+            return scenes
+
+        while self.pos < len(self.buffer):
+            ch = self.buffer[self.pos]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                if self.depth == 0:
+                    self.scene_start = self.pos
+                self.depth += 1
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0 and self.scene_start is not None:
+                    raw = self.buffer[self.scene_start : self.pos + 1]
+                    self.scene_start = None
+                    try:
+                        scenes.append((self.emitted, json.loads(raw)))
+                        self.emitted += 1
+                    except ValueError:
+                        pass
+            elif ch == "]" and self.depth == 0:
+                # End of the scenes array; metadata after it is parsed at the end
+                self.pos = len(self.buffer)
+                self.in_scenes = False
+                self.done = True
+                break
+
+            self.pos += 1
+
+        return scenes
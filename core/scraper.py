@@ -4,20 +4,44 @@ import random
 import datetime
 import re
 import os
-from groq import Groq  # <--- CHANGED
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
 from core.db_manager import DBManager
+from core.feed_cache import FeedCache
+from core.model_router import ModelRouter
+from core.preranker import HeadlinePreRanker
+from core.article_fetcher import ArticleFetcher
 from dotenv import load_dotenv
-from core.db_manager import DBManager
 
 
 class NewsScraper:
     def __init__(self):
         self.db = DBManager()
-        # Initialize Groq Client
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))  # <--- CHANGED
-        self.model = "llama-3.3-70b-versatile"  # Fast and free on Groq
+        # Shared Groq gateway behind the model router ("judge" -> instant model)
+        self.llm = ModelRouter.shared()
+        # 🟢 NEW: Local TF-IDF pre-ranker keeps only the top K headlines for the judge
+        self.preranker = HeadlinePreRanker(top_k=int(os.getenv("PRERANK_TOP_K", "20")))
         self.headers = {"User-Agent": "Mozilla/5.0"}
 
+        # 🟢 NEW: One pooled keep-alive session shared by every feed request
+        self.max_workers = int(os.getenv("SCRAPE_WORKERS", "8"))
+        self.feed_timeout = float(os.getenv("SCRAPE_FEED_TIMEOUT", "10"))
+        self.slot_deadline = float(os.getenv("SCRAPE_DEADLINE", "15"))
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=self.max_workers, pool_maxsize=self.max_workers
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # 🟢 NEW: Conditional-GET cache + "seen entries" diffing
+        self.feed_cache = FeedCache()
+
+        # 🟢 NEW: Optional full-article extraction for the chosen topic(s)
+        self.article_fetcher = ArticleFetcher(session=self.session)
+
         self.niche_map = {
             "morning": {
                 "niche": "motivation",
@@ -73,15 +97,77 @@ class NewsScraper:
             return "night"
 
     def fetch_rss(self, url):
+        """
+        Conditional GET against the feed cache. Returns (record, headers,
+        entries) without touching the cache, or None on 304 / failure.
+        The caller commits the result with feed_cache.diff().
+        """
+        record = self.feed_cache.load(url)
         try:
-            r = requests.get(url, headers=self.headers, timeout=10)
+            r = self.session.get(
+                url,
+                headers=self.feed_cache.conditional_headers(record),
+                timeout=self.feed_timeout,
+            )
             if r.status_code == 200:
-                return feedparser.parse(r.content).entries[
+                entries = feedparser.parse(r.content).entries[
                     :10
                 ]  # increased to 10 for more variety
+                return record, r.headers, entries
         except:
             pass
-        return []
+        return None
+
+    # 🟢 NEW: Concurrent harvest with a global deadline for the whole slot
+    def harvest_feeds(self, sources, deadline=None):
+        """
+        Fetches every feed in parallel over the shared session.
+        Returns {url: entries} for the feeds that answered before the deadline;
+        slow feeds are abandoned instead of stalling the run.
+        """
+        deadline = self.slot_deadline if deadline is None else deadline
+        results = {}
+        if not sources:
+            return results
+
+        started = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(sources)))
+        futures = {pool.submit(self.fetch_rss, url): url for url in sources}
+        pending = set(futures)
+
+        try:
+            while pending:
+                remaining = deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                done, pending = wait(
+                    pending, timeout=remaining, return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    url = futures[future]
+                    try:
+                        fetched = future.result()
+                    except Exception:
+                        fetched = None
+                    # Validators and "seen" ids are only saved for feeds we
+                    # actually use, so a late feed is retried in full next run
+                    if fetched is None:
+                        results[url] = []
+                    else:
+                        record, headers, entries = fetched
+                        results[url] = self.feed_cache.diff(url, record, headers, entries)
+        finally:
+            # Don't block on stragglers; their sockets time out on their own
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.monotonic() - started
+        if pending:
+            print(
+                f"   ⏱️ Deadline hit after {elapsed:.1f}s: skipped {len(pending)} slow feed(s)."
+            )
+        else:
+            print(f"   📡 Harvested {len(sources)} feeds in {elapsed:.1f}s.")
+        return results
 
     # 🟢 NEW: AI VIRAL JUDGE
     def pick_viral_topic(self, candidates, niche):
@@ -112,12 +198,12 @@ class NewsScraper:
             )
 
             # CALL GROQ API INSTEAD OF OLLAMA
-            chat_completion = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model=self.model,
-            )
-
-            content = chat_completion.choices[0].message.content.strip()
+            messages = [{"role": "user", "content": prompt}]
+            content = self.llm.complete(
+                "judge",
+                messages,
+                expected_output_tokens=16,
+            ).strip()
             match = re.search(r"\d+", content)
 
             if match:
@@ -128,6 +214,7 @@ class NewsScraper:
                     )
                     return candidates[index]
 
+            self.llm.reject("judge", messages)
             print("      ⚠️ AI failed to return a valid number. Picking random.")
             return random.choice(candidates)
 
@@ -135,11 +222,8 @@ class NewsScraper:
             print(f"      ❌ Groq Error: {e}. Fallback to random.")
             return random.choice(candidates)
 
-   # 🟢 NEW: Request Top 3 indices from the AI
-    def pick_top_3_viral_topics(self, candidates, niche):
-        """
-        Uses Groq (Cloud AI) to analyze titles and pick the TOP 3 click-worthy ones.
-        """
+    @staticmethod
+    def build_top_3_prompt(candidates, niche):
         titles = [f"{i}. {c['title']}" for i, c in enumerate(candidates)]
         titles_text = "\n".join(titles)
 
@@ -158,20 +242,29 @@ class NewsScraper:
         OUTPUT FORMAT: Return ONLY a JSON dictionary with a key "indices" containing an array of exactly 3 integer indices of the best headlines. 
         Example: {{"indices": [5, 12, 2]}}
         """
+        return prompt
+
+   # 🟢 NEW: Request Top 3 indices from the AI
+    def pick_top_3_viral_topics(self, candidates, niche):
+        """
+        Uses Groq (Cloud AI) to analyze titles and pick the TOP 3 click-worthy ones.
+        """
+        prompt = self.build_top_3_prompt(candidates, niche)
+        messages = [
+            {"role": "system", "content": "You output ONLY valid JSON dictionaries."},
+            {"role": "user", "content": prompt}
+        ]
+        response_format = {"type": "json_object"}
 
         try:
             print(f"   🤖 Groq Judge: Analyzing {len(candidates)} headlines for the Top 3...")
 
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You output ONLY valid JSON dictionaries."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=self.model,
-                response_format={"type": "json_object"} 
-            )
-
-            content = chat_completion.choices[0].message.content.strip()
+            content = self.llm.complete(
+                "judge",
+                messages,
+                response_format=response_format,
+                expected_output_tokens=32,
+            ).strip()
             
             import json
             response_data = json.loads(content)
@@ -181,45 +274,154 @@ class NewsScraper:
             for index in indices[:3]:
                 if isinstance(index, int) and 0 <= index < len(candidates):
                     top_3_candidates.append(candidates[index])
-            
+
+            if not top_3_candidates:
+                # Don't let the next attempt replay this answer from the cache
+                self.llm.reject("judge", messages, response_format)
             print(f"      🏆 AI Selected 3 Potential Winners.")
             return top_3_candidates
 
         except Exception as e:
             print(f"      ❌ Groq Error: {e}. Fallback to random 3.")
+            self.llm.reject("judge", messages, response_format)
             import random
             return random.sample(candidates, min(3, len(candidates)))
 
-    # 🟢 OPTIMIZED: The 4-Attempt Loop with Top 3 Batch Checking
-    def scrape_targeted_niche(self, forced_slot=None):
-        slot = forced_slot if forced_slot else self.get_time_slot()
+    def gather_candidates(self, slot):
+        """Harvest -> DB pre-filter -> local pre-rank for one slot."""
         config = self.niche_map.get(slot, self.niche_map["noon"])
         niche = config["niche"]
 
-        print(f"🕵️‍♂️ Strategy: {slot.upper()} ({niche})")
-
         # Step 1: Gather raw candidates without checking the DB yet!
         candidates = []
+        harvested = self.harvest_feeds(config["sources"])
         for url in config["sources"]:
-            entries = self.fetch_rss(url)
+            entries = harvested.get(url, [])
             for e in entries:
                 if hasattr(e, "title"):
                     candidates.append({
                         "title": e.title,
                         "summary": getattr(e, "summary", e.title)[:3000],
                         "link": getattr(e, "link", ""),
+                        "published": self.feed_cache.published_ts(e),
                         "niche": niche,
                     })
 
+        # 🟢 NEW: Feeds unchanged since last slot -> top up from the cached entries
+        if len(candidates) < 3:
+            known = {c["link"] for c in candidates}
+            for url in config["sources"]:
+                for e in self.feed_cache.recent(url):
+                    if e["link"] not in known:
+                        known.add(e["link"])
+                        candidates.append({
+                            "title": e["title"],
+                            "summary": e["summary"][:3000],
+                            "link": e["link"],
+                            "published": e.get("published"),
+                            "niche": niche,
+                        })
+            print(f"   ♻️ Few new entries; pool topped up from feed cache ({len(candidates)}).")
+
         if not candidates:
             print("❌ No articles found in RSS feeds. Try a different slot.")
+            return []
+
+        # 🟢 NEW: Drop DB duplicates up front so the judge only sees fresh headlines
+        candidates = self.db.filter_new(candidates)
+        if not candidates:
+            print("❌ Every harvested article was already covered recently.")
+            return []
+
+        # 🟢 NEW: Shrink the judge prompt to the locally best K headlines
+        pool_size = len(candidates)
+        candidates = self.preranker.rank(
+            candidates,
+            niche,
+            profile_titles=self.db.recent_titles(days=30, niche=niche, status="uploaded"),
+            recent_titles=self.db.recent_titles(days=7),
+        )
+        if len(candidates) < pool_size:
+            print(f"   📉 Pre-ranker: kept top {len(candidates)} of {pool_size} headlines.")
+
+        return candidates
+
+    # 🟢 NEW: Topic bank - harvest every slot in one pass and store ranked topics
+    def fill_topic_bank(self, per_niche=3):
+        """
+        Scrapes all niche_map slots concurrently, judges each pool once and
+        banks up to `per_niche` ranked, de-duplicated topics per slot.
+        Slot runs then pop from the bank instead of scraping live.
+        """
+        print(f"🏦 Topic Bank: harvesting {len(self.niche_map)} slots in one pass...")
+
+        def bank_slot(slot):
+            niche = self.niche_map[slot]["niche"]
+            candidates = self.gather_candidates(slot)
+            if not candidates:
+                return slot, 0
+            ranked = self.pick_top_3_viral_topics(candidates, niche)
+            # Judge picks first, then the best of the pre-ranked remainder
+            ranked += [c for c in candidates if c not in ranked]
+            ranked = ranked[:per_niche]
+
+            articles = self.article_fetcher.fetch_many([c["link"] for c in ranked])
+            for c in ranked:
+                c["article_text"] = articles.get(c["link"], "")
+            return slot, self.db.bank_topics(slot, niche, ranked)
+
+        with ThreadPoolExecutor(max_workers=len(self.niche_map)) as pool:
+            for slot, count in pool.map(bank_slot, self.niche_map):
+                print(f"   🏦 {slot.upper()}: banked {count} topic(s).")
+
+    def use_banked_topic(self, slot):
+        """Pops the best non-expired banked topic for this slot into a task."""
+        while True:
+            topic = self.db.pop_banked_topic(slot)
+            if not topic:
+                return False
+            # Another slot (or a manual run) may have covered it since banking
+            if self.db.task_exists(topic["title"], topic["link"]):
+                continue
+
+            print(f"      🏦 Banked Topic Used: '{topic['title'][:40]}...'")
+            self.db.add_task(
+                topic["title"],
+                topic["summary"],
+                f"{topic['niche'].upper()}",
+                "pending",
+                {
+                    "niche": topic["niche"],
+                    "niche_slot": slot,
+                    "source_url": topic["link"],
+                    "article_text": topic.get("article_text")
+                    or self.article_fetcher.fetch(topic["link"]),
+                },
+            )
+            return True
+
+    # 🟢 OPTIMIZED: The 4-Attempt Loop with Top 3 Batch Checking
+    def scrape_targeted_niche(self, forced_slot=None):
+        slot = forced_slot if forced_slot else self.get_time_slot()
+        config = self.niche_map.get(slot, self.niche_map["noon"])
+        niche = config["niche"]
+
+        print(f"🕵️‍♂️ Strategy: {slot.upper()} ({niche})")
+
+        # Step 0: Banked topic available? Then no live scraping at all.
+        if self.use_banked_topic(slot):
+            return
+
+        # Step 1: Gather fresh, pre-ranked candidates
+        candidates = self.gather_candidates(slot)
+        if not candidates:
             return
 
         # Step 2: The Optimized Retry Loop
         attempts = 0
         max_tries = 4
         
-        while attempts < max_tries and len(candidates) >= 3:
+        while attempts < max_tries and candidates:
             print(f"   🔄 Attempt {attempts + 1}/{max_tries} (Batch of 3)...")
             
             # Ask AI for Top 3
@@ -250,7 +452,12 @@ class NewsScraper:
                     final_winner["summary"],
                     f"{niche.upper()}",
                     "pending",
-                    {"niche": niche, "niche_slot": slot, "source_url": final_winner["link"]},
+                    {
+                        "niche": niche,
+                        "niche_slot": slot,
+                        "source_url": final_winner["link"],
+                        "article_text": self.article_fetcher.fetch(final_winner["link"]),
+                    },
                 )
                 return  
             else:
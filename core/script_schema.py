@@ -0,0 +1,99 @@
+import re
+
+
+class ScriptValidator:
+    """
+    Strict schema for the brain's JSON script.
+
+    Scene:    text (non-empty str), keywords (exactly 2 str), image_count (1 or 2)
+    Metadata: title (<= 50 chars), description, hashtags, tags
+
+    `validate` repairs what can be fixed locally (types, counts, lengths)
+    and reports what can't, so the brain can re-ask the model for just the
+    broken scenes / fields instead of rerunning the whole script.
+    """
+
+    METADATA_FIELDS = ("title", "description", "hashtags", "tags")
+    MAX_TITLE = 50
+
+    def _clean_str(self, value):
+        if isinstance(value, (int, float)):
+            value = str(value)
+        if not isinstance(value, str):
+            return ""
+        return value.strip()
+
+    def repair_scene(self, scene):
+        """Returns (scene, problems) for one scene dict."""
+        if not isinstance(scene, dict):
+            return None, ["scene is not an object"]
+
+        problems = []
+        fixed = dict(scene)
+
+        fixed["text"] = self._clean_str(scene.get("text"))
+        if not fixed["text"]:
+            problems.append("'text' is missing or empty")
+
+        keywords = scene.get("keywords")
+        if isinstance(keywords, str):
+            keywords = re.split(r"[,;/|]", keywords)
+        if not isinstance(keywords, list):
+            keywords = []
+        keywords = [k for k in (self._clean_str(k) for k in keywords) if k]
+        # De-duplicate while keeping order, then cap at 2
+        keywords = list(dict.fromkeys(keywords))[:2]
+        fixed["keywords"] = keywords
+        if len(keywords) < 2:
+            problems.append(f"'keywords' needs exactly 2 search terms (got {len(keywords)})")
+
+        try:
+            count = int(float(scene.get("image_count", 1)))
+        except (TypeError, ValueError):
+            count = 1
+        fixed["image_count"] = min(2, max(1, count))
+
+        return fixed, problems
+
+    def repair_metadata(self, data):
+        """Returns (metadata, missing_fields)."""
+        meta = {}
+        missing = []
+        for field in self.METADATA_FIELDS:
+            value = data.get(field)
+            if isinstance(value, list):
+                sep = " " if field == "hashtags" else ", "
+                value = sep.join(self._clean_str(v) for v in value if self._clean_str(v))
+            value = self._clean_str(value)
+            if not value:
+                missing.append(field)
+            meta[field] = value
+
+        if len(meta["title"]) > self.MAX_TITLE:
+            meta["title"] = meta["title"][: self.MAX_TITLE].rsplit(" ", 1)[0].strip()
+        return meta, missing
+
+    def validate(self, data):
+        """
+        Returns (script, bad_scenes, missing_metadata):
+          script           - repaired copy of `data`
+          bad_scenes       - {index: [problems]} for scenes needing a re-ask
+          missing_metadata - metadata fields the model left out
+        Raises ValueError when there is no scene list at all.
+        """
+        if not isinstance(data, dict) or not isinstance(data.get("scenes"), list) or not data["scenes"]:
+            raise ValueError("Invalid JSON structure from AI")
+
+        meta, missing = self.repair_metadata(data)
+        script = dict(data)
+        script.update(meta)
+
+        scenes = []
+        bad = {}
+        for i, scene in enumerate(data["scenes"]):
+            fixed, problems = self.repair_scene(scene)
+            scenes.append(fixed if fixed is not None else {})
+            if problems:
+                bad[i] = problems
+        script["scenes"] = scenes
+        return script, bad, missing
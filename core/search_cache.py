@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+
+class SearchCache:
+    """
+    Stock-provider search cache + quota accounting (Pexels, Unsplash).
+
+    * Responses are cached per (provider, endpoint, query, orientation) for
+      SEARCH_CACHE_TTL_HOURS, so repeated CTA / niche keywords and fallback
+      chains don't spend API calls.
+    * Every live call is counted per provider per hour, and the provider's
+      own X-Ratelimit-* headers are recorded. A provider that is near its
+      quota is skipped instead of burning a request (and a timeout) on it.
+    """
+
+    HOURLY_LIMITS = {"pexels": 200, "unsplash": 50}
+
+    def __init__(self, path="data/search_cache.db"):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = float(os.getenv("SEARCH_CACHE_TTL_HOURS", "24")) * 3600
+        self.reserve = int(os.getenv("PROVIDER_QUOTA_RESERVE", "5"))
+        self.hourly_limits = {
+            p: int(os.getenv(f"{p.upper()}_HOURLY_LIMIT", str(limit)))
+            for p, limit in self.HOURLY_LIMITS.items()
+        }
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                provider TEXT, endpoint TEXT, query TEXT, orientation TEXT,
+                body TEXT NOT NULL, fetched_at REAL NOT NULL,
+                PRIMARY KEY (provider, endpoint, query, orientation)
+            );
+            CREATE TABLE IF NOT EXISTS usage (
+                provider TEXT, hour INTEGER, requests INTEGER NOT NULL,
+                PRIMARY KEY (provider, hour)
+            );
+            CREATE TABLE IF NOT EXISTS quota (
+                provider TEXT PRIMARY KEY,
+                remaining INTEGER, quota_limit INTEGER, reset_at REAL,
+                updated_at REAL NOT NULL
+            );
+            """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def _key(provider, endpoint, query, orientation):
+        return (provider, endpoint, " ".join((query or "").lower().split()), orientation or "")
+
+    def get(self, provider, endpoint, query, orientation=None):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT body, fetched_at FROM responses WHERE provider=? AND endpoint=? AND query=? AND orientation=?",
+                self._key(provider, endpoint, query, orientation),
+            ).fetchone()
+        if not row or time.time() - row[1] > self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def put(self, provider, endpoint, query, orientation, data):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (*self._key(provider, endpoint, query, orientation), json.dumps(data), time.time()),
+            )
+            self.conn.commit()
+
+    def record_request(self, provider, headers):
+        """Counts one live call and stores the provider's rate-limit headers."""
+        now = time.time()
+        hour = int(now // 3600)
+
+        def header_int(name):
+            try:
+                return int(float(headers.get(name)))
+            except (TypeError, ValueError):
+                return None
+
+        remaining = header_int("X-Ratelimit-Remaining")
+        limit = header_int("X-Ratelimit-Limit")
+        reset = header_int("X-Ratelimit-Reset")
+        # Pexels sends an epoch timestamp; Unsplash resets hourly
+        reset_at = reset if reset and reset > 1e9 else (hour + 1) * 3600
+
+        with self._lock:
+            self.conn.execute(
+                """INSERT INTO usage VALUES (?, ?, 1)
+                   ON CONFLICT(provider, hour) DO UPDATE SET requests = requests + 1""",
+                (provider, hour),
+            )
+            if remaining is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO quota VALUES (?, ?, ?, ?, ?)",
+                    (provider, remaining, limit, reset_at, now),
+                )
+            self.conn.commit()
+
+    def near_quota(self, provider):
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT remaining, reset_at FROM quota WHERE provider=?", (provider,)
+            ).fetchone()
+            used = self.conn.execute(
+                "SELECT requests FROM usage WHERE provider=? AND hour=?",
+                (provider, int(now // 3600)),
+            ).fetchone()
+
+        if row and row[0] is not None and row[1] and row[1] > now and row[0] <= self.reserve:
+            return True
+        limit = self.hourly_limits.get(provider)
+        return bool(limit and used and used[0] >= limit - self.reserve)
+
+    def stats(self):
+        hour = int(time.time() // 3600)
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT provider, requests FROM usage WHERE hour=?", (hour,)
+            ).fetchall()
+        return dict(rows)
@@ -0,0 +1,95 @@
+import re
+import difflib
+import hashlib
+import random
+
+
+class TitleIndex:
+    """
+    MinHash / LSH index over character trigrams of a title.
+
+    Each title is reduced to `bands` short band-hashes. Two titles that are
+    near-duplicates share at least one band with high probability, so a
+    lookup only has to compare against the few titles in matching buckets
+    instead of every title in the window. Candidates are then confirmed with
+    the same difflib ratio the old linear scan used.
+    """
+
+    _PRIME = (1 << 61) - 1
+
+    def __init__(self, bands=16, rows=4, threshold=0.85, seed=1337):
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+
+        # Fixed seed -> the same title always hashes to the same bands,
+        # across processes and across runs (required for the Mongo index).
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, self._PRIME), rng.randrange(0, self._PRIME))
+            for _ in range(bands * rows)
+        ]
+
+        # Local (in-memory) buckets: band -> list of (key, title)
+        self._buckets = {}
+
+    @staticmethod
+    def normalize(title):
+        clean = re.sub(r"[^\w\s]", " ", (title or "").lower())
+        return re.sub(r"\s+", " ", clean).strip()
+
+    def shingles(self, title):
+        text = self.normalize(title)
+        if len(text) < 3:
+            return {text} if text else set()
+        return {text[i : i + 3] for i in range(len(text) - 2)}
+
+    def signature(self, title):
+        hashed = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+            for s in self.shingles(title)
+        ]
+        if not hashed:
+            return []
+        return [min((a * h + b) % self._PRIME for h in hashed) for a, b in self._perms]
+
+    def band_keys(self, title):
+        """Band hashes stored on the task document (`title_bands`)."""
+        sig = self.signature(title)
+        if not sig:
+            return []
+        keys = []
+        for band in range(self.bands):
+            chunk = sig[band * self.rows : (band + 1) * self.rows]
+            digest = hashlib.blake2b(
+                ",".join(map(str, chunk)).encode("utf-8"), digest_size=8
+            ).hexdigest()
+            keys.append(f"{band}:{digest}")
+        return keys
+
+    def similarity(self, a, b):
+        return difflib.SequenceMatcher(None, a.lower(), b.lower()).ratio()
+
+    def best_match(self, title, candidates):
+        """Returns (similarity, title) of the closest candidate above threshold."""
+        best = (0.0, None)
+        for existing in candidates:
+            score = self.similarity(title, existing)
+            if score > self.threshold and score > best[0]:
+                best = (score, existing)
+        return best
+
+    # --- Local mode (benchmarks, offline use) ---
+    def add(self, key, title):
+        for band in self.band_keys(title):
+            self._buckets.setdefault(band, []).append((key, title))
+
+    def query(self, title):
+        seen = set()
+        candidates = []
+        for band in self.band_keys(title):
+            for key, existing in self._buckets.get(band, []):
+                if key not in seen:
+                    seen.add(key)
+                    candidates.append(existing)
+        return self.best_match(title, candidates)
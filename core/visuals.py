@@ -3,7 +3,16 @@ import time
 import requests
 import random
 import re
+import math
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from core.db_manager import DBManager
+from core.media_library import MediaLibrary
+from core.search_cache import SearchCache
+from core.normalizer import ClipNormalizer
+from core.asset_qc import AssetQC
 from dotenv import load_dotenv
 from PIL import Image
 import io
@@ -11,12 +20,79 @@ import io
 load_dotenv()
 
 
+class ProviderLimiter:
+    """
+    Per-provider concurrency cap + minimum spacing between request starts.
+    Replaces the old blind `time.sleep(1)` per scene.
+    """
+
+    def __init__(self, concurrency, min_interval=0.0):
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self.min_interval = min_interval
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+        return False
+
+
 class VisualScout:
     def __init__(self):
         self.db = DBManager()
         self.unsplash_key = os.getenv("UNSPLASH_ACCESS_KEY")
         self.pexels_key = os.getenv("PEXELS_API_KEY")
 
+        # 🟢 NEW: Shared pooled session + per-provider limits
+        self.workers = int(os.getenv("VISUAL_WORKERS", "6"))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.workers * 4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.limiters = {
+            "google": ProviderLimiter(2, 0.5),
+            "pexels": ProviderLimiter(3, 0.2),
+            "unsplash": ProviderLimiter(2, 0.2),
+            "media": ProviderLimiter(self.workers),  # CDN downloads
+        }
+        # 🟢 NEW: Local media library (keyword -> previously downloaded assets)
+        self.library = MediaLibrary()
+
+        # 🟢 NEW: Cached provider searches + per-provider quota accounting
+        self.search_cache = SearchCache()
+        self._quota_warned = set()
+
+        # 🟢 NEW: Per-asset QC at download time (a failed asset loses its race)
+        self.qc = AssetQC()
+        # Extra results a provider may try after its asset fails QC/reuse
+        self.qc_refetches = int(os.getenv("QC_REFETCHES", "2"))
+
+        # Download caps (bytes)
+        self.max_video_bytes = int(float(os.getenv("VIDEO_MAX_MB", "60")) * 1024 * 1024)
+        self.max_image_bytes = int(float(os.getenv("IMAGE_MAX_MB", "15")) * 1024 * 1024)
+        # Speculative prefetch results: (task_id, keyword) -> [(n, path, hash)]
+        # Keyed by keyword, not scene index: the voice stage may drop scenes.
+        self.prefetched = {}
+        self._prefetch_lock = threading.Lock()
+
+        # Source URLs already picked per task (concurrent slots, same search)
+        self._claimed_urls = set()
+        self._claim_lock = threading.Lock()
+
+        # Images wait this long for the video provider before racing it
+        self.video_headstart = float(os.getenv("VISUAL_VIDEO_HEADSTART", "3"))
+
     def is_valid_image(self, content):
         try:
             img = Image.open(io.BytesIO(content))
@@ -25,74 +101,183 @@ class VisualScout:
         except:
             return False
 
+    def is_valid_image_file(self, path):
+        try:
+            with Image.open(path) as img:
+                img.verify()
+            return True
+        except:
+            return False
+
+    # 🟢 NEW: Streamed, size-capped download; never leaves a partial file behind
+    def stream_to_file(self, url, path, max_bytes, headers=None, cancel=None, validate=None):
+        """
+        Streams `url` to `path` via a .part file with iter_content. Aborts
+        (and deletes the partial) when the body exceeds `max_bytes`, the
+        transfer is cut short, the slot is cancelled or `validate(path)`
+        rejects it. Only a complete, valid file is renamed into place.
+        """
+        part = f"{path}.part"
+        ok = False
+        try:
+            with self.limiters["media"]:
+                with self.session.get(url, headers=headers, stream=True, timeout=20) as r:
+                    if r.status_code != 200:
+                        return False
+                    expected = int(r.headers.get("Content-Length") or 0)
+                    if expected > max_bytes:
+                        print(f"      ⚠️ Skipping oversized asset ({expected / 1e6:.0f} MB).")
+                        return False
+
+                    size = 0
+                    with open(part, "wb") as f:
+                        for chunk in r.iter_content(chunk_size=256 * 1024):
+                            if cancel and cancel.is_set():
+                                return False
+                            size += len(chunk)
+                            if size > max_bytes:
+                                print(f"      ⚠️ Asset exceeded {max_bytes / 1e6:.0f} MB cap. Aborted.")
+                                return False
+                            f.write(chunk)
+
+                    if expected and size != expected:
+                        return False
+            if validate and not validate(part):
+                return False
+            os.replace(part, path)
+            ok = True
+            return True
+        except Exception as e:
+            print(f"      ❌ Download failed: {e}")
+            return False
+        finally:
+            if not ok and os.path.exists(part):
+                os.remove(part)
+
+    @staticmethod
+    def pick_rendition(files, target=(1080, 1920)):
+        """
+        Smallest rendition that still covers the 1080x1920 frame (compared
+        short side / long side, so orientation doesn't matter); if none
+        covers it, the largest one available.
+        """
+        short_t, long_t = sorted(target)
+
+        def key(v):
+            w, h = v.get("width") or 0, v.get("height") or 0
+            covers = min(w, h) >= short_t and max(w, h) >= long_t
+            return (0, w * h) if covers else (1, -(w * h))
+
+        return min(files, key=key) if files else None
+
+    def get(self, provider, url, **kwargs):
+        with self.limiters[provider]:
+            return self.session.get(url, **kwargs)
+
+    def search(self, provider, endpoint, url, query, orientation=None, headers=None, timeout=10):
+        """
+        Provider search through the cache. Returns the JSON body, or None on
+        failure or when the provider is too close to its quota to spend a call.
+        """
+        cached = self.search_cache.get(provider, endpoint, query, orientation)
+        if cached is not None:
+            return cached
+
+        if self.search_cache.near_quota(provider):
+            if provider not in self._quota_warned:
+                self._quota_warned.add(provider)
+                print(f"      🚦 {provider.title()} is near its hourly quota. Skipping it.")
+            return None
+
+        res = self.get(provider, url, headers=headers, timeout=timeout)
+        self.search_cache.record_request(provider, res.headers)
+        if res.status_code != 200:
+            return None
+        data = res.json()
+        self.search_cache.put(provider, endpoint, query, orientation, data)
+        return data
+
     # 🟢 NEW: Fetch Actual B-Roll Video from Pexels
-    def use_pexels_video_search(self, query, path):
+    def use_pexels_video_search(self, query, path, cancel=None, skip=None):
         if not self.pexels_key:
             return False
-            
+
         print(f"      🎥 Pexels Video Search: hunting for '{query}'...")
         try:
             # orientation=portrait fetches Shorts-friendly vertical videos
             url = f"https://api.pexels.com/videos/search?query={query}&per_page=5&orientation=portrait"
-            res = requests.get(url, headers={"Authorization": self.pexels_key}, timeout=10)
-            
-            if res.status_code == 200 and res.json().get("videos"):
-                videos = res.json()["videos"]
-                if videos:
-                    # Get the first video and find an mp4 file link
-                    video_files = videos[0]["video_files"]
-                    mp4_files = [v for v in video_files if v['file_type'] == 'video/mp4']
-                    
-                    if mp4_files:
-                        # Sort to pick a decent resolution without overloading memory (e.g., HD)
-                        mp4_files = sorted(mp4_files, key=lambda x: x.get('width', 0) * x.get('height', 0), reverse=True)
-                        video_url = mp4_files[0]["link"]
-                        
-                        content = requests.get(video_url, timeout=20).content
-                        with open(path, "wb") as f:
-                            f.write(content)
-                        print("      ✅ Pexels Video Secured.")
-                        return True
+            data = self.search(
+                "pexels", "videos/search", url, query, "portrait",
+                headers={"Authorization": self.pexels_key},
+            )
+
+            # First result the reuse policy allows (not videos[0] every time)
+            for video in (data or {}).get("videos") or []:
+                mp4_files = [v for v in video["video_files"] if v['file_type'] == 'video/mp4']
+                if not mp4_files or (cancel and cancel.is_set()):
+                    continue
+                # Closest rendition to 1080x1920 (not the 4K original)
+                video_url = self.pick_rendition(mp4_files)["link"]
+                if skip and skip(video_url):
+                    continue
+
+                if self.stream_to_file(video_url, path, self.max_video_bytes, cancel=cancel):
+                    print("      ✅ Pexels Video Secured.")
+                    return video_url
+                break
         except Exception as e:
             print(f"      ❌ Pexels Video Search Failed: {e}")
-            
+
         return False
 
-    def use_stock_search(self, query, path):
-        # 1. Unsplash (Fallback for images)
-        if self.unsplash_key:
-            try:
-                url = f"https://api.unsplash.com/search/photos?query={query}&per_page=3&client_id={self.unsplash_key}"
-                res = requests.get(url, timeout=5)
-                if res.status_code == 200 and res.json()["results"]:
-                    img_url = random.choice(res.json()["results"])["urls"]["regular"]
-                    content = requests.get(img_url).content
-                    if self.is_valid_image(content):
-                        with open(path, "wb") as f:
-                            f.write(content)
-                        return True
-            except:
-                pass
+    def use_unsplash_search(self, query, path, cancel=None, skip=None):
+        if not self.unsplash_key:
+            return False
+        try:
+            url = f"https://api.unsplash.com/search/photos?query={query}&per_page=3&client_id={self.unsplash_key}"
+            data = self.search("unsplash", "search/photos", url, query, timeout=5)
+            if data and data.get("results"):
+                if cancel and cancel.is_set():
+                    return False
+                img_url = self.pick_unused([r["urls"]["regular"] for r in data["results"]], skip)
+                if img_url and self.stream_to_file(
+                    img_url, path, self.max_image_bytes, cancel=cancel, validate=self.is_valid_image_file
+                ):
+                    return img_url
+        except:
+            pass
+        return False
 
-        # 2. Pexels Image (Fallback)
-        if self.pexels_key:
-            try:
-                url = f"https://api.pexels.com/v1/search?query={query}&per_page=3"
-                res = requests.get(
-                    url, headers={"Authorization": self.pexels_key}, timeout=5
-                )
-                if res.status_code == 200 and res.json()["photos"]:
-                    img_url = random.choice(res.json()["photos"])["src"]["large2x"]
-                    content = requests.get(img_url).content
-                    if self.is_valid_image(content):
-                        with open(path, "wb") as f:
-                            f.write(content)
-                        return True
-            except:
-                pass
+    def use_pexels_image_search(self, query, path, cancel=None, skip=None):
+        if not self.pexels_key:
+            return False
+        try:
+            url = f"https://api.pexels.com/v1/search?query={query}&per_page=3"
+            data = self.search(
+                "pexels", "v1/search", url, query,
+                headers={"Authorization": self.pexels_key}, timeout=5,
+            )
+            if data and data.get("photos"):
+                if cancel and cancel.is_set():
+                    return False
+                img_url = self.pick_unused([p["src"]["large2x"] for p in data["photos"]], skip)
+                if img_url and self.stream_to_file(
+                    img_url, path, self.max_image_bytes, cancel=cancel, validate=self.is_valid_image_file
+                ):
+                    return img_url
+        except:
+            pass
         return False
 
-    def search_google_images(self, query, path):
+    def use_stock_search(self, query, path, cancel=None, skip=None):
+        # 1. Unsplash (Fallback for images)
+        found = self.use_unsplash_search(query, path, cancel, skip)
+        if found:
+            return found
+        # 2. Pexels Image (Fallback)
+        return self.use_pexels_image_search(query, path, cancel, skip)
+
+    def search_google_images(self, query, path, cancel=None, skip=None):
         print(f"      🌍 Web Search (Image): hunting for '{query}'...")
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/103.0.0.0 Safari/537.36"
@@ -100,19 +285,27 @@ class VisualScout:
 
         try:
             url = f"https://www.google.com/search?q={query}&tbm=isch&udm=2"
-            res = requests.get(url, headers=headers, timeout=10)
+            res = self.get("google", url, headers=headers, timeout=10)
             matches = re.findall(r'"(https?://[^"]+?\.(?:jpg|jpeg|png))"', res.text)
 
             if matches:
                 for img_url in matches[:3]:
+                    if cancel and cancel.is_set():
+                        return False
                     try:
                         img_url = img_url.encode().decode("unicode_escape")
-                        img_data = requests.get(img_url, headers=headers, timeout=5).content
-                        if self.is_valid_image(img_data):
-                            with open(path, "wb") as f:
-                                f.write(img_data)
+                        if skip and skip(img_url):
+                            continue
+                        if self.stream_to_file(
+                            img_url,
+                            path,
+                            self.max_image_bytes,
+                            headers=headers,
+                            cancel=cancel,
+                            validate=self.is_valid_image_file,
+                        ):
                             print("      ✅ Web Image Secured.")
-                            return True
+                            return img_url
                     except:
                         continue
         except Exception as e:
@@ -120,6 +313,257 @@ class VisualScout:
 
         return False
 
+    @staticmethod
+    def pick_unused(urls, skip=None):
+        """Random choice among the search results the reuse policy allows."""
+        urls = list(urls)
+        random.shuffle(urls)
+        for url in urls:
+            if not (skip and skip(url)):
+                return url
+        return None
+
+    def reuse_filter(self, task_id):
+        """
+        skip(url) for the provider searches: True when the URL was used
+        within MEDIA_REUSE_DAYS or was already picked for this task.
+        """
+        def skip(url):
+            key = (str(task_id), url)
+            with self._claim_lock:
+                if key in self._claimed_urls:
+                    return True
+                if self.library.recently_used(task_id, url=url):
+                    return True
+                self._claimed_urls.add(key)
+                return False
+
+        return skip
+
+    # 🟢 NEW: Race several providers for one slot; first valid asset wins
+    def race(self, racers, base_path, task_id=None):
+        """
+        racers: [(name, search_fn, query, ext)] - all start together except
+        image providers, which give video a short head start (b-roll is
+        preferred). Each racer writes to its own temp file and must pass
+        AssetQC to win; the winner is moved to `base_path + ext`, losers are
+        cancelled/cleaned up.
+        Results blocked by the media library's reuse policy are skipped.
+        Returns the winner {"path", "provider", "query", "source_url"} or None.
+        """
+        skip = self.reuse_filter(task_id)
+        won = threading.Event()
+        video_done = threading.Event()
+        lock = threading.Lock()
+        winner = {}
+        has_video = any(ext == ".mp4" for _, _, _, ext in racers)
+
+        def run(name, fn, query, ext):
+            if ext != ".mp4" and has_video:
+                video_done.wait(self.video_headstart)
+            if won.is_set():
+                return
+            tmp = f"{base_path}.{name}.part{ext}"
+            source_url = None
+            ok = False
+            try:
+                # A rejected result's URL is already claimed by `skip`, so the
+                # next call to the same provider returns its next allowed result
+                for attempt in range(1 + self.qc_refetches):
+                    found = fn(query, tmp, cancel=won, skip=skip)
+                    if not found or won.is_set():
+                        ok = False
+                        break
+                    source_url = found if isinstance(found, str) else None
+                    ok, reason = self.qc.check(tmp)
+                    # Same bytes behind a different URL still count as reuse
+                    if ok and self.library.recently_used(task_id, digest=self.library.file_hash(tmp)):
+                        ok, reason = False, "used recently"
+                    if ok or source_url is None:
+                        break
+                    more = "Trying its next result..." if attempt < self.qc_refetches else "Giving up."
+                    print(f"      🔎 {name} asset for '{query}' rejected ({reason}). {more}")
+            except Exception:
+                ok = False
+            finally:
+                if ext == ".mp4":
+                    video_done.set()
+
+            with lock:
+                if ok and not won.is_set():
+                    final = base_path + ext
+                    os.replace(tmp, final)
+                    winner["path"] = final
+                    winner["query"] = query
+                    winner["source_url"] = source_url
+                    winner["provider"] = name.rsplit("_", 1)[0] if name[-1].isdigit() else name
+                    won.set()
+                    return
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        threads = [threading.Thread(target=run, args=r, daemon=True) for r in racers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return winner or None
+
+    def fetch_candidate(self, kw, keywords, base, task_id=None):
+        """
+        Library -> provider race -> fallback keywords for one keyword.
+        Returns (path, asset hash) or (None, None); never writes a placeholder.
+        """
+        # 🟢 NEW: Library hit -> no network at all
+        path, digest = self.library.lookup(kw, task_id, base)
+        if path:
+            ok, reason = self.qc.check(path)
+            if ok:
+                print(f"      📚 Media Library hit for '{kw}'.")
+                return path, digest
+            # Stored before QC existed: drop it for good and fetch fresh
+            print(f"      🔎 QC rejected library asset for '{kw}': {reason}.")
+            os.remove(path)
+            self.library.forget(digest)
+
+        # 2. Race Pexels Video (.mp4) against the stock image providers (.jpg)
+        won = self.race(
+            [
+                ("pexels_video", self.use_pexels_video_search, kw, ".mp4"),
+                ("unsplash", self.use_unsplash_search, kw, ".jpg"),
+                ("pexels_image", self.use_pexels_image_search, kw, ".jpg"),
+            ],
+            base,
+            task_id,
+        )
+
+        # 3. Fallback to other keywords if specific one failed entirely
+        fallbacks = [
+            (f"pexels_video_{n}", self.use_pexels_video_search, fallback_kw, ".mp4")
+            for n, fallback_kw in enumerate(keywords)
+            if fallback_kw != kw
+        ]
+        if not won and fallbacks:
+            print(f"      ⚠️ '{kw}' failed. Retrying video with {[f[2] for f in fallbacks]}...")
+            won = self.race(fallbacks, base, task_id)
+
+        if won:
+            digest = self.library.add(
+                won["path"], won["query"], won["provider"], task_id, won.get("source_url")
+            )
+            return won["path"], digest
+        return None, None
+
+    def placeholder(self, base):
+        path_jpg = base + ".jpg"
+        if os.path.exists(path_jpg):
+            os.remove(path_jpg)  # may be a hard link into the media library
+        Image.new("RGB", (1080, 1920), (10, 10, 10)).save(path_jpg)
+        return path_jpg
+
+    def acquire_slot(self, i, j, keywords, folder, task_id=None):
+        """Finds one visual for scene i / visual j. Always returns a usable path."""
+        kw = keywords[j % len(keywords)]
+        base = os.path.join(folder, f"scene_{i}_visual_{j}")
+        print(f"   🖼️ Scene {i+1} (Visual {j+1}): Search '{kw}'")
+
+        # 0. Speculatively prefetched while the voice stage was running?
+        prefetched = self.take_prefetched(task_id, kw, base)
+        if prefetched:
+            print(f"      ⚡ Using prefetched asset for '{kw}'.")
+            return prefetched
+
+        # 1. Hero Image Force Web Search (Scene 0, Image 0)
+        if i == 0 and j == 0:
+            won = self.race(
+                [("google", self.search_google_images, kw, ".jpg")], base, task_id
+            )
+            if won:
+                return won["path"]
+
+        path, _ = self.fetch_candidate(kw, keywords, base, task_id)
+        if path:
+            return path
+
+        # 4. Final Fallback: Placeholder Image
+        print(f"      ❌ All searches failed. Using placeholder.")
+        return self.placeholder(base)
+
+    # 🟢 NEW: Speculative prefetch - runs on a 'scripted' task while TTS is busy
+    @staticmethod
+    def estimate_image_count(text):
+        # ~2.8 spoken words/s at +10% rate, one visual per 4s (as in VoiceEngine)
+        seconds = len((text or "").split()) / 2.8
+        return max(1, math.ceil(seconds / 4.0))
+
+    def prefetch_visuals(self):
+        """
+        Downloads candidates for every scene keyword of the 'scripted' task
+        before durations are known. `download_visuals` later reconciles them
+        with the final image_count and discards what it doesn't need.
+        """
+        task = self.db.collection.find_one({"status": "scripted"})
+        if not task:
+            return
+
+        scenes = task.get("script_data", [])
+        folder = os.path.join(task["folder_path"], "prefetch")
+        os.makedirs(folder, exist_ok=True)
+
+        jobs = []
+        for i, scene in enumerate(scenes):
+            keywords = scene.get("keywords") or ["nature"]
+            estimate = self.estimate_image_count(scene.get("text"))
+            for j in range(estimate):
+                jobs.append((i, j % len(keywords), j // len(keywords), keywords))
+
+        print(f"🔮 Prefetching {len(jobs)} visual candidates while audio renders...")
+
+        def run(job):
+            i, k, n, keywords = job
+            base = os.path.join(folder, f"scene_{i}_kw_{k}_{n}")
+            if i == 0 and k == 0 and n == 0:
+                won = self.race(
+                    [("google", self.search_google_images, keywords[0], ".jpg")],
+                    base,
+                    task["_id"],
+                )
+                if won:
+                    return job, won["path"], None
+            path, digest = self.fetch_candidate(keywords[k], keywords, base, task["_id"])
+            return job, path, digest
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for (_, k, n, keywords), path, digest in pool.map(run, jobs):
+                if path:
+                    key = (task["_id"], keywords[k].lower())
+                    self.prefetched.setdefault(key, []).append((n, path, digest))
+
+        for candidates in self.prefetched.values():
+            candidates.sort()
+        print(f"   🔮 Prefetched {sum(len(c) for c in self.prefetched.values())} assets.")
+
+    def take_prefetched(self, task_id, kw, base):
+        """Moves the next prefetched asset for keyword `kw` into place, if any."""
+        with self._prefetch_lock:
+            candidates = self.prefetched.get((task_id, kw.lower()))
+            if not candidates:
+                return None
+            _, path, _ = candidates.pop(0)
+        if not os.path.exists(path):
+            return None
+        final = base + os.path.splitext(path)[1]
+        os.replace(path, final)
+        return final
+
+    def discard_prefetched(self, task_id, folder):
+        """Drops leftovers and frees their library reservation for this task."""
+        for key in [k for k in self.prefetched if k[0] == task_id]:
+            for _, _, digest in self.prefetched.pop(key):
+                if digest:
+                    self.library.release(digest, task_id)
+        shutil.rmtree(os.path.join(folder, "prefetch"), ignore_errors=True)
+
     def download_visuals(self):
         task = self.db.collection.find_one({"status": "voiced"})
         if not task:
@@ -129,65 +573,56 @@ class VisualScout:
         folder = task["folder_path"]
         print(f"🎬 Visual Scout: Processing {len(scenes)} scenes...")
 
-        updated_scenes = []
-
+        # 🟢 NEW: Every (scene, visual) slot is acquired concurrently
+        slots = []
         for i, scene in enumerate(scenes):
-            keywords = scene.get("keywords", ["nature"])
-            count = scene.get("image_count", 1)
-
-            visual_paths = []
-
-            for j in range(count):
-                kw = keywords[j % len(keywords)]
-                base_filename = f"scene_{i}_visual_{j}"
-                print(f"   🖼️ Scene {i+1} (Visual {j+1}/{count}): Search '{kw}'")
-
-                saved_path = None
-
-                # 1. Hero Image Force Web Search (Scene 0, Image 0)
-                if i == 0 and j == 0:
-                    path_jpg = os.path.join(folder, base_filename + ".jpg")
-                    if self.search_google_images(kw, path_jpg):
-                        saved_path = path_jpg
-
-                # 2. Try Pexels Video (.mp4)
-                if not saved_path:
-                    path_mp4 = os.path.join(folder, base_filename + ".mp4")
-                    if self.use_pexels_video_search(kw, path_mp4):
-                        saved_path = path_mp4
-
-                # 3. Fallback to Stock Images (.jpg)
-                if not saved_path:
-                    path_jpg = os.path.join(folder, base_filename + ".jpg")
-                    if self.use_stock_search(kw, path_jpg):
-                        saved_path = path_jpg
-
-                # 4. Fallback to other keywords if specific one failed entirely
-                if not saved_path:
-                    for fallback_kw in keywords:
-                        if fallback_kw != kw:
-                            print(f"      ⚠️ '{kw}' failed. Retrying video with '{fallback_kw}'...")
-                            path_mp4 = os.path.join(folder, base_filename + ".mp4")
-                            if self.use_pexels_video_search(fallback_kw, path_mp4):
-                                saved_path = path_mp4
-                                break
-
-                # 5. Final Fallback: Placeholder Image
-                if not saved_path:
-                    print(f"      ❌ All searches failed. Using placeholder.")
-                    path_jpg = os.path.join(folder, base_filename + ".jpg")
-                    Image.new("RGB", (1080, 1920), (10, 10, 10)).save(path_jpg)
-                    saved_path = path_jpg
-
-                visual_paths.append(saved_path)
+            keywords = scene.get("keywords") or ["nature"]
+            for j in range(scene.get("image_count", 1)):
+                slots.append((i, j, keywords))
+
+        started = time.monotonic()
+        normalized = {}
 
+        # 🟢 NEW: Each asset is handed to the normalizer as soon as it lands
+        with ClipNormalizer() as normalizer:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {
+                    pool.submit(self.acquire_slot, i, j, keywords, folder, task["_id"]): (i, j)
+                    for i, j, keywords in slots
+                }
+                paths = {}
+                for future in as_completed(futures):
+                    i, j = futures[future]
+                    paths[(i, j)] = future.result()
+                    scene = scenes[i]
+                    slot_duration = scene.get("duration", 0) / max(1, scene.get("image_count", 1))
+                    normalized[(i, j)] = normalizer.submit(
+                        paths[(i, j)],
+                        slot_duration,
+                        os.path.join(folder, f"scene_{i}_visual_{j}_norm.mp4"),
+                    )
+            normalized = {slot: wait() for slot, wait in normalized.items()}
+
+        visual_paths = {}
+        normalized_paths = {}
+        for i, j, _ in slots:
+            visual_paths.setdefault(i, []).append(paths[(i, j)])
+            normalized_paths.setdefault(i, []).append(normalized.get((i, j)))
+
+        updated_scenes = []
+        for i, scene in enumerate(scenes):
             # Updated key from 'image_paths' to 'image_paths' (kept same for backward compatibility with db)
-            scene["image_paths"] = visual_paths
+            scene["image_paths"] = visual_paths.get(i, [])
+            # Render-ready 1080x1920/24fps intermediates (None where normalization failed)
+            scene["normalized_paths"] = normalized_paths.get(i, [])
             updated_scenes.append(scene)
-            time.sleep(1)
+
+        self.discard_prefetched(task["_id"], folder)
+        print(f"   ⏱️ {len(slots)} visuals acquired in {time.monotonic() - started:.1f}s.")
+        print(f"   🚦 Provider calls this hour: {self.search_cache.stats()}")
 
         self.db.collection.update_one(
             {"_id": task["_id"]},
             {"$set": {"script_data": updated_scenes, "status": "ready_to_assemble"}},
         )
-        print("✅ Visuals Secured.")
\ No newline at end of file
+        print("✅ Visuals Secured.")
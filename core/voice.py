@@ -1,8 +1,65 @@
 import edge_tts
 import os
+import json
+import shutil
+import asyncio
+import hashlib
+import threading
 import math
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from mutagen.mp3 import MP3
 from core.db_manager import DBManager
+from core.lru_dir import LRUDirectory, place
+
+class TTSCache:
+    """
+    Content-addressed TTS cache: hash(text, voice, rate) -> mp3 + measured
+    duration. Hits are hard-linked (or copied) into the task folder, so the
+    recurring CTA line and other repeated narration cost no network call and
+    no MP3 parse. Least recently used entries are evicted past the budget.
+    """
+
+    def __init__(self, cache_dir="data/tts_cache"):
+        self.cache_dir = cache_dir
+        max_bytes = int(float(os.getenv("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024)
+        self.lru = LRUDirectory(self.cache_dir, max_bytes, ".mp3", companions=(".json",))
+
+    @staticmethod
+    def make_key(text, voice, rate):
+        payload = json.dumps([text.strip(), voice, rate], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.mp3", f"{base}.json"
+
+    def contains(self, key):
+        return all(os.path.exists(p) for p in self._paths(key))
+
+    def fetch(self, key, dest):
+        """Places a cached mp3 at `dest`; returns its metadata dict or None."""
+        mp3_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            place(mp3_path, dest)
+        except (OSError, ValueError):
+            return None
+        self.lru.touch(meta_path, mp3_path)
+        return meta
+
+    def store(self, key, src, meta):
+        mp3_path, meta_path = self._paths(key)
+        try:
+            place(src, mp3_path)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+        except OSError as e:
+            print(f"   ⚠️ TTS cache write failed: {e}")
+            return
+        self.lru.evict()
+
 
 class VoiceEngine:
     def __init__(self):
@@ -17,50 +74,194 @@ class VoiceEngine:
             "general": "en-US-GuyNeural"              # Standard fallback
         }
 
-    async def generate_audio(self):
-        task = self.db.collection.find_one({"status": "scripted"})
-        if not task:
+        # 🟢 NEW: Parallel TTS limits
+        self.concurrency = int(os.getenv("TTS_CONCURRENCY", "8"))
+        self.max_retries = int(os.getenv("TTS_RETRIES", "3"))
+        self.rate = "+10%"
+        self.cache = TTSCache()
+
+        # 🟢 NEW: Background TTS for scenes streamed by the brain
+        self._prewarm_pool = None
+        self._prewarm_lock = threading.Lock()
+
+    def voice_for(self, niche):
+        return self.voice_map.get((niche or "general").lower(), "en-US-GuyNeural")
+
+    # 🟢 NEW: ScriptGenerator subscriber - warm the TTS cache while the script streams
+    def prewarm(self, task, index, scene):
+        """
+        Synthesizes a streamed scene into the TTS cache in the background.
+        generate_audio later finds it by content, so the provisional stream
+        index doesn't matter and rewritten scenes simply miss the cache.
+        """
+        text = (scene.get("text") or "").strip()
+        if not text:
             return
+        with self._prewarm_lock:
+            if self._prewarm_pool is None:
+                self._prewarm_pool = ThreadPoolExecutor(max_workers=self.concurrency)
+            self._prewarm_pool.submit(self._warm, text, self.voice_for(task.get("niche")), index)
 
-        folder = task.get("folder_path")
-        scenes = task.get("script_data", [])
-        niche = task.get("niche", "general").lower()
+    def _warm(self, text, voice, index):
+        key = self.cache.make_key(text, voice, self.rate)
+        if self.cache.contains(key):
+            return
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self.cache.cache_dir)
+        os.close(fd)
+        try:
+            words = asyncio.run(self.synthesize(text, voice, tmp))
+            duration = MP3(tmp).info.length
+            self.cache.store(key, tmp, {"duration": duration, "words": words})
+            print(f"   🔥 Streamed scene {index + 1} pre-voiced ({duration:.1f}s).")
+        except Exception as e:
+            print(f"   ⚠️ Pre-voicing scene {index + 1} failed: {e}")
+        finally:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
 
-        # Determine the best voice for this video's emotional tone
-        selected_voice = self.voice_map.get(niche, "en-US-GuyNeural")
+    def finish_prewarm(self):
+        """Waits for in-flight pre-voicing so generate_audio hits the cache."""
+        with self._prewarm_lock:
+            pool, self._prewarm_pool = self._prewarm_pool, None
+        if pool:
+            pool.shutdown(wait=True)
 
-        print(f"🎙️ Generating Audio ({len(scenes)} segments) using {selected_voice}...")
+    def communicator(self, text, voice):
+        try:
+            # edge-tts >= 7 only emits word events when asked to
+            return edge_tts.Communicate(text, voice, rate=self.rate, boundary="WordBoundary")
+        except TypeError:
+            return edge_tts.Communicate(text, voice, rate=self.rate)
 
-        updated_scenes = []
-        for i, scene in enumerate(scenes):
-            filename = f"voice_{i}.mp3"
-            path = os.path.join(folder, filename)
-            text = scene["text"]
+    # 🟢 NEW: Stream the synthesis so WordBoundary events can be captured
+    async def synthesize(self, text, voice, path):
+        """Writes the mp3 to `path`; returns [{"word", "start", "end"}] in seconds."""
+        words = []
+        with open(path, "wb") as f:
+            async for chunk in self.communicator(text, voice).stream():
+                if chunk["type"] == "audio":
+                    f.write(chunk["data"])
+                elif chunk["type"] == "WordBoundary":
+                    # Offsets are in 100-nanosecond ticks
+                    start = chunk["offset"] / 1e7
+                    words.append(
+                        {
+                            "word": chunk["text"],
+                            "start": round(start, 3),
+                            "end": round(start + chunk["duration"] / 1e7, 3),
+                        }
+                    )
+        return words
 
-            try:
-                # 🟢 Apply the dynamically selected voice
-                communicate = edge_tts.Communicate(text, selected_voice, rate="+10%")
-                await communicate.save(path)
+    async def synthesize_scene(self, i, scene, folder, voice, semaphore):
+        """TTS for one scene with retries; returns the updated scene or None."""
+        filename = f"voice_{i}.mp3"
+        path = os.path.join(folder, filename)
+        text = scene["text"]
+
+        # 🟢 NEW: Cached narration -> no TTS call, no MP3 parse
+        key = self.cache.make_key(text, voice, self.rate)
+        cached = self.cache.fetch(key, path)
+        words = []
+        if cached:
+            duration = cached["duration"]
+            words = cached.get("words", [])
+            print(f"   💾 Seg {i+1}: TTS cache hit.")
+        else:
+            async with semaphore:
+                for attempt in range(1, self.max_retries + 1):
+                    try:
+                        if os.path.exists(path):
+                            os.remove(path)
+                        # 🟢 Apply the dynamically selected voice
+                        words = await self.synthesize(text, voice, path)
+
+                        duration = MP3(path).info.length
+                        self.cache.store(key, path, {"duration": duration, "words": words})
+                        break
+                    except Exception as e:
+                        if attempt == self.max_retries:
+                            print(f"   ❌ Failed scene {i}: {e}")
+                            return None
+                        print(f"   ⚠️ Scene {i} attempt {attempt} failed: {e}. Retrying...")
+                        await asyncio.sleep(attempt)
+
+        scene["audio_path"] = path
+        scene["duration"] = duration
+        # Per-word offsets (seconds, scene-relative) -> captions without Whisper
+        scene["words"] = words
 
-                duration = MP3(path).info.length
+        required_images = math.ceil(duration / 4.0)
+        scene["image_count"] = max(1, int(required_images))
+        img_duration = duration / scene["image_count"]
 
-                scene["audio_path"] = path
-                scene["duration"] = duration
+        print(
+            f"   Seg {i+1}: {duration:.1f}s -> {scene['image_count']} images (~{img_duration:.1f}s each)"
+        )
+        return scene
+
+    # 🟢 NEW: One gapless narration track + scene offset table for the renderer
+    def build_narration(self, scenes, folder):
+        """
+        Joins the per-scene mp3s frame-by-frame into NARRATION.mp3 (same
+        codec settings, so no decode/re-encode) and returns
+        {"path", "duration", "offsets": [{"scene", "start", "duration"}]}.
+        """
+        if not scenes:
+            return None
 
-                required_images = math.ceil(duration / 4.0)
-                scene["image_count"] = max(1, int(required_images))
-                img_duration = duration / scene["image_count"]
+        path = os.path.join(folder, "NARRATION.mp3")
+        offsets = []
+        timeline = 0.0
+        try:
+            with open(path, "wb") as out:
+                for i, scene in enumerate(scenes):
+                    with open(scene["audio_path"], "rb") as f:
+                        shutil.copyfileobj(f, out)
+                    offsets.append(
+                        {"scene": i, "start": round(timeline, 3), "duration": scene["duration"]}
+                    )
+                    timeline += scene["duration"]
+        except OSError as e:
+            print(f"   ⚠️ Narration track failed: {e}")
+            return None
 
-                updated_scenes.append(scene)
-                print(
-                    f"   Seg {i+1}: {duration:.1f}s -> {scene['image_count']} images (~{img_duration:.1f}s each)"
-                )
+        print(f"   🎧 Narration track: {timeline:.1f}s ({len(offsets)} scenes).")
+        return {"path": path, "duration": round(timeline, 3), "offsets": offsets}
 
-            except Exception as e:
-                print(f"   ❌ Failed scene {i}: {e}")
+    async def generate_audio(self):
+        task = self.db.collection.find_one({"status": "scripted"})
+        if not task:
+            return
+
+        folder = task.get("folder_path")
+        scenes = task.get("script_data", [])
+        # Determine the best voice for this video's emotional tone
+        selected_voice = self.voice_for(task.get("niche"))
+
+        print(f"🎙️ Generating Audio ({len(scenes)} segments) using {selected_voice}...")
+
+        # 🟢 NEW: Synthesize all scenes concurrently (bounded), keep scene order
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *[
+                self.synthesize_scene(i, scene, folder, selected_voice, semaphore)
+                for i, scene in enumerate(scenes)
+            ]
+        )
+        updated_scenes = [scene for scene in results if scene is not None]
+        narration = self.build_narration(updated_scenes, folder)
 
         self.db.collection.update_one(
             {"_id": task["_id"]},
-            {"$set": {"script_data": updated_scenes, "status": "voiced"}},
+            {
+                "$set": {
+                    "script_data": updated_scenes,
+                    "narration": narration,
+                    "status": "voiced",
+                }
+            },
         )
         print("✅ Audio Generation Complete.")
\ No newline at end of file
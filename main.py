@@ -5,14 +5,42 @@ import json
 import os
 import glob  # <--- WAS MISSING
 import datetime
+import threading
 from core.scraper import NewsScraper
 from core.brain import ScriptGenerator
 from core.voice import VoiceEngine
 from core.visuals import VisualScout
-from core.assembler import VideoAssembler
 from core.upload_prep import UploadManager
 from core.uploader import YouTubeUploader
 from core.db_manager import DBManager
+from core.groq_gateway import GroqGateway
+from core.model_router import ModelRouter
+
+
+def run_assembly():
+    db = DBManager()
+    task = db.collection.find_one({"status": "ready_to_assemble"}, {"_id": 1})
+    if not task:
+        return
+
+    if os.getenv("RENDER_WORKER", "0").lower() in ("1", "true", "yes"):
+        # The warm worker already holds moviepy/Whisper in memory
+        job_id = db.enqueue_render(task["_id"])
+        print(f"📨 Assembly queued for render worker (job {job_id})...")
+        status = db.wait_render_job(
+            job_id,
+            timeout=float(os.getenv("RENDER_TIMEOUT", "3600")),
+            pickup_timeout=float(os.getenv("RENDER_PICKUP_TIMEOUT", "120")),
+        )
+        print(f"🎞️ Render worker finished: {status}")
+        if status == "done":
+            return
+        print("🔁 Falling back to in-process assembly...")
+
+    # Imported lazily so runs using the worker never load moviepy here
+    from core.assembler import VideoAssembler
+
+    VideoAssembler().assemble(task["_id"])
 
 
 def run_creation_pipeline(slot_name):
@@ -26,22 +54,39 @@ def run_creation_pipeline(slot_name):
     # 2. BRAIN (Scripting with Groq)
     print("---------------------------------------")
     brain = ScriptGenerator()
+    voice = VoiceEngine()
+    if brain.stream_enabled:
+        # Streamed scenes are pre-voiced while the rest of the script generates
+        brain.subscribe(voice.prewarm)
     brain.generate_script()
 
-    # 3. VOICE (Async)
+    stats = GroqGateway.shared().stats()
+    print(
+        f"📈 Groq usage: {stats['requests']} requests, {stats['cache_hits']} cache hits, "
+        f"{stats['prompt_tokens'] + stats['completion_tokens']} tokens, "
+        f"{stats['retries']} retries, {stats['throttled_seconds']:.1f}s throttled"
+    )
+    for model, h in ModelRouter.shared().stats().items():
+        latency = f"{h['latency']:.1f}s" if h["latency"] is not None else "n/a"
+        print(f"   🔀 {model}: {h['calls']} calls, {h['failure_rate']:.0%} failed, ~{latency}")
+
+    # 3. VOICE (Async) + speculative visual prefetch running alongside it
     print("---------------------------------------")
-    voice = VoiceEngine()
+    visuals = VisualScout()
+    prefetch = threading.Thread(target=visuals.prefetch_visuals, daemon=True)
+    prefetch.start()
+
+    voice.finish_prewarm()
     asyncio.run(voice.generate_audio())
+    prefetch.join()
 
-    # 4. VISUALS
+    # 4. VISUALS (reconciles the prefetched candidates with final durations)
     print("---------------------------------------")
-    visuals = VisualScout()
     visuals.download_visuals()
 
-    # 5. ASSEMBLER
+    # 5. ASSEMBLER (persistent render worker when enabled, else in-process)
     print("---------------------------------------")
-    assembler = VideoAssembler()
-    assembler.assemble()
+    run_assembly()
 
     # 6. UPLOAD PREP & UPLOAD
     print("---------------------------------------")
@@ -105,7 +150,32 @@ def run_creation_pipeline(slot_name):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("slot", help="The time slot", default="noon")
+    parser.add_argument("slot", nargs="?", help="The time slot", default="noon")
+    parser.add_argument(
+        "--script-batch",
+        type=int,
+        metavar="N",
+        help="Script up to N pending tasks concurrently, then exit",
+    )
+    parser.add_argument(
+        "--fill-bank",
+        action="store_true",
+        help="Scrape all slots and bank ranked topics, then exit",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Bypass the Groq response cache"
+    )
     args = parser.parse_args()
 
+    if args.no_cache:
+        os.environ["LLM_CACHE_DISABLE"] = "1"
+
+    if args.script_batch:
+        ScriptGenerator().generate_scripts_batch(limit=args.script_batch)
+        sys.exit(0)
+
+    if args.fill_bank:
+        NewsScraper().fill_topic_bank()
+        sys.exit(0)
+
     run_creation_pipeline(args.slot)
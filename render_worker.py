@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import argparse
+import threading
+import traceback
+from core.db_manager import DBManager
+from core.assembler import VideoAssembler, RenderCancelled
+
+# Long-lived render worker: imports moviepy once, keeps Whisper warm (if it
+# is ever needed) and consumes assembly jobs from the Mongo 'render_jobs'
+# queue. Start it once next to scheduler.py and set RENDER_WORKER=1.
+
+
+def heartbeat(db, job_id, stop, cancel):
+    interval = max(1.0, db.render_lease / 4)
+    while not stop.wait(interval):
+        try:
+            alive = db.heartbeat_render_job(job_id)
+        except Exception as e:
+            # Transient Mongo errors (AutoReconnect, ...) must not end the lease
+            print(f"⚠️ Heartbeat failed ({e.__class__.__name__}). Retrying...")
+            continue
+        if not alive:
+            print("🛑 Job was cancelled by the pipeline. Stopping the render...")
+            cancel.set()
+            return
+
+
+def serve(preload=False, poll=2.0):
+    db = DBManager()
+    assembler = VideoAssembler()
+    if preload:
+        assembler.load_whisper()
+
+    print("===================================================")
+    print("🏭 RENDER WORKER READY")
+    print(f"   - Whisper: {'loaded' if assembler.model else 'lazy (loads on first fallback)'}")
+    print("   - Press Ctrl+C to stop")
+    print("===================================================")
+
+    while True:
+        job = db.claim_render_job()
+        if not job:
+            time.sleep(poll)
+            continue
+
+        print(f"\n🎬 Job {job['_id']} -> task {job['task_id']}")
+        # Keep the lease alive so the pipeline (and other workers) know we're rendering
+        stop = threading.Event()
+        cancel = threading.Event()
+        beat = threading.Thread(target=heartbeat, args=(db, job["_id"], stop, cancel), daemon=True)
+        beat.start()
+        try:
+            assembler.assemble(job["task_id"], cancel=cancel)
+            task = db.collection.find_one({"_id": job["task_id"]}, {"status": 1})
+            ok = task and task.get("status") == "ready_to_upload"
+            db.finish_render_job(job["_id"], "done" if ok else "failed", None if ok else "Task not assembled")
+        except RenderCancelled:
+            print("🛑 Render stopped; the pipeline takes over this task.")
+        except Exception as e:
+            traceback.print_exc()
+            db.finish_render_job(job["_id"], "failed", str(e))
+        finally:
+            stop.set()
+            beat.join()
+            # Tells a waiting pipeline it may now assemble the task itself
+            try:
+                db.mark_render_stopped(job["_id"])
+            except Exception as e:
+                print(f"⚠️ Could not acknowledge stop: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--preload-whisper", action="store_true", help="Load Whisper at startup")
+    args = parser.parse_args()
+
+    try:
+        serve(preload=args.preload_whisper or os.getenv("PRELOAD_WHISPER") == "1")
+    except KeyboardInterrupt:
+        sys.exit(0)
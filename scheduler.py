@@ -22,8 +22,17 @@ def job(slot):
         print(f"❌ ERROR in {slot} job: {e}")
 
 
+def bank_job():
+    print("\n🏦 REFILLING TOPIC BANK (all slots)")
+    try:
+        subprocess.run([PYTHON_EXEC, "main.py", "--fill-bank"], check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ ERROR in topic bank refill: {e}")
+
+
 # --- 📅 THE SCHEDULE ---
 # Adjust times as needed
+schedule.every().day.at("10:30").do(bank_job)  # Bank topics for every slot
 schedule.every().day.at("11:00").do(job, slot="morning")  # Motivation
 schedule.every().day.at("13:00").do(job, slot="noon")  # Space
 schedule.every().day.at("18:00").do(job, slot="evening")  # Nature